@@ -12,16 +12,16 @@ from solver import Solver, GREEDY_BETA
 from packing.pallet import PALLET_SIZE, PALLET_MAX_WEIGHT
 
 
-def _worker (id, return_dict, problem, maxtime=3600, betas=(0.3,0.6), opt=True):
+def _worker (id, return_dict, problem, maxtime=3600, betas=(0.3,0.6), opt=True, stopping=None):
     print(f"Worker {id} is digging.")
     orderlines, dists, pallet_size, max_weight = problem.orderlines, problem.dists, problem.pallet_size, problem.pallet_max_weight
     edges = utils.get_edges(orderlines, dists)
     solver = Solver(orderlines, edges, dists, pallet_size, max_weight)
-    sol, cost, iterations = solver.multi_start(maxtime, betas)
+    sol, cost, iterations = solver.multi_start(maxtime, betas, stopping=stopping)
     if opt:
         paths_dict = solver.opt2_paths(sol, dists)
         cost = solver.getCost(paths_dict, dists)
-    return_dict[id] = (sol, cost, iterations)
+    return_dict[id] = (sol, cost, iterations, solver.stop_reason)
     print(f"Worker {id} ended.")
 
 
@@ -124,9 +124,12 @@ def literature_test ():
 
 
 
-def literature_multiprocess_test ():
+def literature_multiprocess_test (stopping=None):
     """
     The tests made on literature benchmarks.
+
+    :param stopping: <StoppingRule> The rule that stops each test before the
+                    available time (e.g., stopping.Stagnation), if any.
     """
     # Clear the file 
     #file = open(f"../LiteratureResults.csv", "w")
@@ -146,7 +149,7 @@ def literature_multiprocess_test ():
 
         proc = multiprocessing.Process(
             target=_worker, 
-            args=(filename, return_dict, problem, maxtime, betas)
+            args=(filename, return_dict, problem, maxtime, betas, True, stopping)
         )
         jobs.append(proc)
         proc.start()
@@ -158,8 +161,8 @@ def literature_multiprocess_test ():
     with open(f"../LiteratureResults.csv", "w") as output_file:
         
         for name, res in sorted(return_dict.items(), key=operator.itemgetter(0)):
-            sol, cost, iterations = res
-            output_file.write(f"{name}, {len(sol)}, {cost} \n")
+            sol, cost, iterations, reason = res
+            output_file.write(f"{name}, {len(sol)}, {cost}, {reason} \n")
 
 
 
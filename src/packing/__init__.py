@@ -1 +1,2 @@
-from .packer import dubePacker
\ No newline at end of file
+from .packer import dubePacker
+from .engines import PackerEngine, DubeEngine, LayerEngine
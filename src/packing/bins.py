@@ -0,0 +1,151 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import bisect
+import itertools
+
+
+# The number of open pallets in each block of the index. A block is split in two
+# when it exceeds twice this size.
+BLOCK_SIZE = 64
+
+
+
+class OpenPallets (object):
+    """
+    An instance of this class is the index of the open pallets of a best-fit procedure
+    (see Solver.sequential), i.e., the pallets that can still receive new cases.
+
+    The pallets are kept sorted for increasing residual volume, and split into blocks
+    of consecutive pallets, each with the maximum residual weight of its pallets.
+    The first pallet with enough volume for a set of cases is found by binary search,
+    and the following blocks whose pallets cannot hold their weight are skipped as a
+    whole. In this way, the pallets without enough volume are never considered, and
+    the ones without enough weight capacity are considered only in the blocks that
+    contain a pallet able to receive the cases.
+    """
+    def __init__ (self, blockSize=BLOCK_SIZE):
+        """
+        Constructor.
+
+        :param blockSize: <int> The number of pallets in each block.
+
+        :attr keys: <list<list<float>>> For each block, the residual volume of its pallets, sorted.
+        :attr pallets: <list<list<Pallet>>> For each block, its pallets, in the same order of the keys.
+        :attr mins: <list<float>> For each block, the smallest residual volume of its pallets.
+        :attr maxWeights: <list<float>> For each block, the largest residual weight of its pallets.
+        """
+        self.blockSize = blockSize
+        self.keys = []
+        self.pallets = []
+        self.mins = []
+        self.maxWeights = []
+
+
+    def __len__ (self):
+        return sum(map(len, self.pallets))
+
+
+    def __iter__ (self):
+        return itertools.chain.from_iterable(self.pallets)
+
+
+    @staticmethod
+    def residual (pallet):
+        """
+        Returns the volume and the weight still available on a pallet.
+        """
+        return pallet.maxVolume - pallet.volume, pallet.maxWeight - pallet.weight
+
+
+    def _block (self, b):
+        """
+        Update the smallest residual volume and the largest residual weight of a block,
+        and remove it if it is empty or split it if it is too large.
+        """
+        keys, pallets = self.keys[b], self.pallets[b]
+        if not keys:
+            del self.keys[b], self.pallets[b], self.mins[b], self.maxWeights[b]
+            return
+        if len(keys) > 2 * self.blockSize:
+            half = len(keys) // 2
+            self.keys[b + 1:b + 1] = [keys[half:]]
+            self.pallets[b + 1:b + 1] = [pallets[half:]]
+            self.mins.insert(b + 1, None)
+            self.maxWeights.insert(b + 1, None)
+            del keys[half:], pallets[half:]
+            self._block(b + 1)
+        self.mins[b] = keys[0]
+        self.maxWeights[b] = max(self.residual(p)[1] for p in pallets)
+
+
+    def add (self, pallet):
+        """
+        Open a pallet, or update its position after it received new cases.
+        The pallets with the same residual volume are kept in the order in which they
+        have been added.
+
+        :param pallet: <Pallet> The pallet.
+        """
+        key, weight = self.residual(pallet)
+        if not self.keys:
+            self.keys.append([key])
+            self.pallets.append([pallet])
+            self.mins.append(key)
+            self.maxWeights.append(weight)
+            return
+        b = max(0, bisect.bisect_right(self.mins, key) - 1)
+        keys = self.keys[b]
+        idx = bisect.bisect_right(keys, key)
+        keys.insert(idx, key)
+        self.pallets[b].insert(idx, pallet)
+        self._block(b)
+
+
+    def remove (self, pallet):
+        """
+        Remove a pallet from the index. It must be called before changing the volume
+        or the weight of the pallet, which define its position.
+
+        :param pallet: <Pallet> The pallet.
+        """
+        key, _ = self.residual(pallet)
+        # The pallets with the same residual volume may start in the previous block
+        for b in range(max(0, bisect.bisect_left(self.mins, key) - 1), len(self.keys)):
+            pallets = self.pallets[b]
+            for idx in range(bisect.bisect_left(self.keys[b], key), len(pallets)):
+                if pallets[idx] is pallet:
+                    del self.keys[b][idx], pallets[idx]
+                    self._block(b)
+                    return
+        raise ValueError("The pallet is not open.")
+
+
+    def candidates (self, hosted):
+        """
+        Iterates the open pallets with enough volume and weight capacity to receive
+        the cases of another pallet, for increasing residual volume.
+        The index must not be changed while iterating, unless the iteration is stopped.
+
+        :param hosted: <Pallet> The pallet whose cases should be moved.
+        """
+        volume, weight = hosted.volume, hosted.weight
+        residual = self.residual
+        first = max(0, bisect.bisect_left(self.mins, volume) - 1)
+        for b in range(first, len(self.keys)):
+            if self.maxWeights[b] < weight:
+                continue
+            keys, pallets = self.keys[b], self.pallets[b]
+            start = bisect.bisect_left(keys, volume) if b == first else 0
+            for idx in range(start, len(pallets)):
+                if residual(pallets[idx])[1] >= weight:
+                    yield pallets[idx]
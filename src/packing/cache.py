@@ -0,0 +1,335 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import collections
+import sys
+
+
+# The default memory (in bytes) that a packing cache can use.
+DEFAULT_MAX_BYTES = 64 * 2 ** 20
+
+
+# The statistics of a packing cache
+CacheInfo = collections.namedtuple("CacheInfo", ("hits", "misses", "evictions", "entries", "currbytes", "maxbytes"))
+
+
+
+def packingKey (pallet, sortedCases):
+    """
+    This method returns the canonical key of a packing, that only depends on the
+    content of the pallet and on the cases to place, and not on the identity of the
+    objects involved. Two packings with the same key always produce the same result.
+
+    The key is made of the size of the pallet, the cases on the pallet (in the order
+    in which they have been packed) with their position, dimensions and strength,
+    the layers of the orderlines, and the cases to place with their
+    dimensions and strength.
+    Codes and orderlines are replaced by the order in which they are met, so that
+    pallets with equivalent content have the same key.
+
+    :param pallet: <Pallet> The pallet in which cases must be placed.
+    :param sortedCases: <list<Case>> The cases to place in the order in which they are placed.
+    :return: <tuple> The key and the list of orderlines in the order they appear into it.
+    """
+    # The part of the key depending on the content of the pallet is computed only
+    # once, and saved on the pallet until its content changes.
+    if pallet.contentKey is None:
+        codes, linesIds, lines = {}, {}, []
+        key = list(pallet.size)
+        extend = key.extend
+        for c in pallet.cases:
+            line = c.orderline
+            if (lineId := linesIds.get(id(line))) is None:
+                lineId = linesIds[id(line)] = len(lines)
+                lines.append(line)
+            extend((c.x, c.y, c.z, c.sizex, c.sizey, c.sizez, c.strength, c.canHold,
+                    codes.setdefault(c.code, len(codes)), lineId))
+        layersMap = pallet.layersMap
+        key.append(-1)
+        extend(layersMap[line] for line in lines)
+        pallet.contentKey = (tuple(key), codes, linesIds, lines)
+
+    palletKey, codes, linesIds, lines = pallet.contentKey
+    codes, linesIds, lines = dict(codes), dict(linesIds), list(lines)
+
+    key = []
+    extend = key.extend
+    for c in sortedCases:
+        line = c.orderline
+        if (lineId := linesIds.get(id(line))) is None:
+            lineId = linesIds[id(line)] = len(lines)
+            lines.append(line)
+        extend((c.sizex, c.sizey, c.sizez, c.strength, c.rotated, codes.setdefault(c.code, len(codes)), lineId))
+
+    return (palletKey, tuple(key)), lines
+
+
+
+def _sizeof (obj):
+    """
+    This method returns the memory (in bytes) used by an object, including the items
+    of the tuples it contains. The small integers are not counted, since they are
+    shared by the interpreter.
+    """
+    size = sys.getsizeof(obj)
+    if type(obj) is tuple:
+        for i in obj:
+            if type(i) is tuple:
+                size += _sizeof(i)
+            elif type(i) is not int or not -5 <= i <= 256:
+                size += sys.getsizeof(i)
+    return size
+
+
+
+class PackingCache (object):
+    """
+    An instance of this class is a cache of the results of the packer, with a
+    bounded memory and a least-recently-used eviction policy.
+
+    Results are saved using the canonical key of the packing (see packingKey). The
+    result of a failed packing is False, while the result of a successful packing
+    is the tuple of the positions of the placed cases and the layers of the
+    placed orderlines.
+
+    The memory of each result is measured with its key and all the values they contain
+    (see _sizeof). The part of the keys that depends on the content of a pallet is shared
+    by all the packings made on that pallet (see packingKey), hence it is counted only
+    once, as long as one of them is cached.
+    """
+    def __init__ (self, maxbytes=DEFAULT_MAX_BYTES):
+        """
+        Constructor.
+
+        :param maxbytes: <int> The memory (in bytes) the cache can use.
+        """
+        self.maxbytes = maxbytes
+        self.currbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = collections.OrderedDict()
+        self.shared = {}      # For the id of each pallet part of the keys, its entries and its memory
+
+
+    def __len__ (self):
+        return len(self.entries)
+
+
+    def get (self, key):
+        """
+        Returns the result saved for a packing or None if it is not cached.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+
+    def _acquire (self, palletKey):
+        """
+        Counts a new entry whose key contains the pallet part palletKey.
+        """
+        if (record := self.shared.get(id(palletKey))) is None:
+            record = self.shared[id(palletKey)] = [0, _sizeof(palletKey)]
+            self.currbytes += record[1]
+        record[0] += 1
+
+
+    def _release (self, palletKey):
+        """
+        Forgets an entry whose key contains the pallet part palletKey.
+        """
+        record = self.shared[id(palletKey)]
+        record[0] -= 1
+        if record[0] == 0:
+            self.currbytes -= record[1]
+            del self.shared[id(palletKey)]
+
+
+    def put (self, key, result):
+        """
+        Saves the result of a packing, evicting the least recently used results
+        if the memory of the cache is exceeded.
+        """
+        palletKey, casesKey = key
+        size = sys.getsizeof(key) + _sizeof(casesKey) + _sizeof(result)
+        size += sys.getsizeof((result, size, palletKey))
+        if (old := self.entries.pop(key, None)) is not None:
+            self.currbytes -= old[1]
+            self._release(old[2])
+        self.entries[key] = (result, size, palletKey)
+        self.currbytes += size
+        self._acquire(palletKey)
+        while self.currbytes > self.maxbytes and self.entries:
+            _, (_, size, palletKey) = self.entries.popitem(last=False)
+            self.currbytes -= size
+            self._release(palletKey)
+            self.evictions += 1
+
+
+    def clear (self):
+        """
+        Removes all the results and resets the statistics.
+        """
+        self.entries.clear()
+        self.shared.clear()
+        self.currbytes = self.hits = self.misses = self.evictions = 0
+
+
+    def info (self):
+        """
+        Returns the statistics of the cache.
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self.entries), self.currbytes, self.maxbytes)
+
+
+
+# The default number of infeasible mergings that an infeasible cache can keep.
+DEFAULT_MAX_ENTRIES = 2 ** 17
+
+
+
+class InfeasibleCache (object):
+    """
+    An instance of this class keeps the mergings of pallets that have been proven
+    infeasible, so that they are not tried again by the packer.
+
+    Since the packer is deterministic, the content of a pallet only depends on the
+    orderlines it has been built from, and on the order in which it has been merged
+    with other pallets. Each pallet is therefore identified by a signature, i.e., a
+    small integer assigned to each different sequence of mergings: the same
+    mergings always lead to the same signature, and a merging between pallets with
+    known signatures can be recognised without looking at their cases.
+
+    Both the signatures and the infeasible mergings are bounded. When the signatures
+    exceed the maximum number of entries they are forgotten, and equivalent pallets
+    will simply receive new signatures; infeasible mergings are evicted with a
+    least-recently-used policy.
+    """
+    def __init__ (self, maxentries=DEFAULT_MAX_ENTRIES):
+        """
+        Constructor.
+
+        :param maxentries: <int> The maximum number of signatures and of infeasible mergings.
+        """
+        self.maxentries = maxentries
+        self.hits = 0
+        self.misses = 0
+        self.signatures = {}
+        self.counter = 0
+        self.entries = collections.OrderedDict()
+
+
+    def __len__ (self):
+        return len(self.entries)
+
+
+    def _signature (self, key):
+        """
+        Returns the signature assigned to a key, assigning a new one if needed.
+        """
+        signatures = self.signatures
+        if (signature := signatures.get(key)) is None:
+            if len(signatures) >= self.maxentries:
+                signatures.clear()
+            signature = signatures[key] = self.counter
+            self.counter += 1
+        return signature
+
+
+    def leaf (self, orderlines):
+        """
+        Returns the signature of a pallet built packing together some orderlines.
+
+        :param orderlines: <list<OrderLine>> The orderlines in the order in which they are packed.
+        """
+        return self._signature(tuple(map(id, orderlines)))
+
+
+    def unique (self):
+        """
+        Returns a new signature, different from all the others, for a pallet whose
+        sequence of mergings is unknown (e.g., a pallet rebuilt from its record).
+        """
+        signature = self.counter
+        self.counter += 1
+        return signature
+
+
+    def merged (self, host, hosted):
+        """
+        Returns the signature of a pallet built merging two pallets (None if
+        the signature of one of them is unknown).
+
+        :param host: <int> The signature of the pallet that receives the cases.
+        :param hosted: <int> The signature of the pallet whose cases are moved.
+        """
+        if host is None or hosted is None:
+            return None
+        return self._signature((host, hosted))
+
+
+    def appended (self, host, orderlines):
+        """
+        Returns the signature of a pallet built packing some orderlines over the
+        cases of another pallet (None if the signature of the pallet is unknown).
+        It never matches the signature of a merging, whose packing is different.
+
+        :param host: <int> The signature of the pallet that receives the cases.
+        :param orderlines: <list<OrderLine>> The orderlines in the order in which they are packed.
+        """
+        if host is None:
+            return None
+        return self._signature((host, tuple(map(id, orderlines))))
+
+
+    def get (self, host, hosted):
+        """
+        Returns True if the merging of two pallets is known to be infeasible.
+
+        :param host: <int> The signature of the pallet that receives the cases.
+        :param hosted: <int> The signature of the pallet whose cases are moved.
+        """
+        if host is None or hosted is None:
+            return False
+        key = (host, hosted)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return True
+        self.misses += 1
+        return False
+
+
+    def put (self, host, hosted):
+        """
+        Saves an infeasible merging, evicting the least recently used ones if
+        the maximum number of entries is exceeded.
+        """
+        if host is None or hosted is None:
+            return
+        self.entries[(host, hosted)] = None
+        if len(self.entries) > self.maxentries:
+            self.entries.popitem(last=False)
+
+
+    def clear (self):
+        """
+        Removes all the signatures and infeasible mergings and resets the statistics.
+        """
+        self.signatures.clear()
+        self.entries.clear()
+        self.hits = self.misses = 0
@@ -17,7 +17,6 @@ Author' contact: mattianeroni93@gmail.com
 
 def resetCase(case):
     currentItem = case.__copy__()
-    currentItem.busyCorners = [False, False, False]
     currentItem.canHold = currentItem.strength
     return currentItem
     
@@ -35,7 +34,13 @@ class Case (object):
     """
     An instance of this class represent one of the rectangular-shaped 3-dimensional cases
     to place into the pallets.
+
+    The attributes are kept in slots, which makes the cases smaller and faster
+    to copy, since the packer copies each case it places.
     """
+    __slots__ = ("orderline", "code", "x", "y", "z", "rotated", "sizex", "sizey", "sizez",
+                 "volume", "weight", "strength", "canHold")
+
     def __init__ (self, orderline, code, sizex, sizey, sizez, weight, strength):
         """
         Constructor.
@@ -59,16 +64,26 @@ class Case (object):
         self.weight = weight
         self.strength = strength
         self.canHold = strength
-        self.busyCorners = [False, False, False]  # Used to speed up the DubePacker
 
     def __repr__(self):
         return f"Case(position={self.position}, size=({self.sizex}, {self.sizey}, {self.sizez})," \
-                 f" weight={self.weight}, strength={self.strength}, rotated={self.rotated}, busyCorners={self.busyCorners})"
+                 f" weight={self.weight}, strength={self.strength}, rotated={self.rotated})"
 
     def __copy__ (self):
         obj = Case.__new__(self.__class__)
-        obj.__dict__.update(self.__dict__)
-        obj.busyCorners = list(self.busyCorners)
+        obj.orderline = self.orderline
+        obj.code = self.code
+        obj.x = self.x
+        obj.y = self.y
+        obj.z = self.z
+        obj.rotated = self.rotated
+        obj.sizex = self.sizex
+        obj.sizey = self.sizey
+        obj.sizez = self.sizez
+        obj.volume = self.volume
+        obj.weight = self.weight
+        obj.strength = self.strength
+        obj.canHold = self.canHold
         return obj
 
     #def __eq__(self, other):
@@ -14,6 +14,8 @@ Written by Mattia Neroni Ph.D., Eng. in July 2021.
 Author' contact: mattianeroni93@gmail.com
 %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
 """
+import numpy as np
+
 
 class Edge (object):
     """
@@ -37,4 +39,146 @@ class Edge (object):
         self.end = end
         self.cost = cost
         self.saving = saving
-        self.inverse = inverse
\ No newline at end of file
+        self.inverse = inverse
+
+
+
+class EdgeTable (object):
+    """
+    An instance of this class represents the set of edges connecting the orderlines
+    to each other, kept as parallel NumPy arrays (i.e., the index of the origin, the
+    index of the end, the cost, and the saving of each edge).
+
+    The table behaves as a sequence of edges: the Edge objects (and their inverse)
+    are only created when they are accessed for the first time, and then kept.
+    """
+    def __init__ (self, orderlines, origin, end, cost, saving):
+        """
+        Constructor.
+
+        :param orderlines: <tuple<OrderLine>> The orderlines connected by the edges.
+        :param origin: <numpy.array> For each edge, the index of the origin orderline.
+        :param end: <numpy.array> For each edge, the index of the end orderline.
+        :param cost: <numpy.array> For each edge, its length.
+        :param saving: <numpy.array> For each edge, the saving defined by Clarke-Wright.
+
+        :attr origins: <list<int>> For each edge, the index of the origin orderline.
+        :attr ends: <list<int>> For each edge, the index of the end orderline.
+                    These lists are faster to read than the NumPy arrays, and share
+                    the same int objects, one for each orderline.
+        """
+        self.orderlines = tuple(orderlines)
+        self.origin = origin
+        self.end = end
+        self.cost = cost
+        self.saving = saving
+        self.lineIndexes = indexes = list(range(len(self.orderlines)))
+        self.origins = [indexes[i] for i in origin.tolist()]
+        self.ends = [indexes[i] for i in end.tolist()]
+        self.created = {}       # The Edge objects already created by index
+        self.indexes = {}       # The index of the Edge objects already created by id
+
+
+    def extend (self, orderlines, origin, end, cost, saving):
+        """
+        This method adds new orderlines and new edges to the table. The indexes
+        of the orderlines and of the edges already in the table do not change,
+        so the new orderlines are indexed after the existing ones.
+
+        :param orderlines: <tuple<OrderLine>> The new orderlines.
+        :param origin: <numpy.array> For each new edge, the index of the origin orderline.
+        :param end: <numpy.array> For each new edge, the index of the end orderline.
+        :param cost: <numpy.array> For each new edge, its length.
+        :param saving: <numpy.array> For each new edge, the saving defined by Clarke-Wright.
+        """
+        self.orderlines += tuple(orderlines)
+        self.origin = np.concatenate((self.origin, origin))
+        self.end = np.concatenate((self.end, end))
+        self.cost = np.concatenate((self.cost, cost))
+        self.saving = np.concatenate((self.saving, saving))
+        indexes = self.lineIndexes
+        indexes.extend(range(len(indexes), len(self.orderlines)))
+        self.origins.extend(indexes[i] for i in origin.tolist())
+        self.ends.extend(indexes[i] for i in end.tolist())
+
+
+    def prune (self, keep):
+        """
+        This method removes some edges from the table. The orderlines do not change,
+        while the edges kept are indexed again in the same order, and their Edge
+        objects (if already created) are kept.
+
+        :param keep: <numpy.array> For each edge, True if it must be kept.
+        """
+        position = np.cumsum(keep) - 1
+        self.origin, self.end = self.origin[keep], self.end[keep]
+        self.cost, self.saving = self.cost[keep], self.saving[keep]
+        flags = keep.tolist()
+        self.origins = [i for i, k in zip(self.origins, flags) if k]
+        self.ends = [i for i, k in zip(self.ends, flags) if k]
+        created = self.created
+        self.created, self.indexes = {}, {}
+        for i, edge in created.items():
+            if flags[i]:
+                self._register(position[i].item(), edge)
+
+
+    @classmethod
+    def fromEdges (cls, orderlines, edges):
+        """
+        This method builds a table from a set of Edge objects, which are kept
+        and returned when accessed.
+
+        :param orderlines: <tuple<OrderLine>> The orderlines connected by the edges.
+        :param edges: <tuple<Edge>> The edges.
+        """
+        index = {id(line): i for i, line in enumerate(orderlines)}
+        table = cls(
+            orderlines,
+            np.fromiter((index[id(e.origin)] for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((index[id(e.end)] for e in edges), dtype=np.int64, count=len(edges)),
+            np.array([e.cost for e in edges]),
+            np.array([e.saving for e in edges]),
+        )
+        for i, edge in enumerate(edges):
+            table._register(i, edge)
+        return table
+
+
+    def _register (self, i, edge):
+        """
+        Keeps an Edge object (and its inverse) as the i-th edge of the table.
+        """
+        self.created[i] = edge
+        self.indexes[id(edge)] = i
+        self.indexes[id(edge.inverse)] = i
+
+
+    def __len__ (self):
+        return len(self.origins)
+
+
+    def __getitem__ (self, i):
+        """
+        Returns the i-th edge, creating it and its inverse if needed.
+        """
+        edge = self.created.get(i)
+        if edge is None:
+            origin, end = self.orderlines[self.origins[i]], self.orderlines[self.ends[i]]
+            cost, saving = self.cost[i].item(), self.saving[i].item()
+            edge = Edge(origin, end, cost, saving)
+            edge.inverse = Edge(end, origin, cost, saving, edge)
+            self._register(i, edge)
+        return edge
+
+
+    def __iter__ (self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+    def indexOf (self, edge):
+        """
+        Returns the index of an edge of the table, or of its inverse.
+        """
+        return self.indexes[id(edge)]
\ No newline at end of file
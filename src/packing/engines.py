@@ -0,0 +1,90 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import abc
+
+from .cache import PackingCache, DEFAULT_MAX_BYTES
+from .packer import dubePacker
+from .layers import layerPacker
+
+
+
+class PackerEngine (abc.ABC):
+    """
+    An instance of this class is a packing engine, i.e., the procedure used by
+    the solver to place the cases of a pallet or an orderline into another pallet.
+
+    Each engine must implement the pack method, and must modify the pallet only if
+    the packing is successful.
+    """
+    def __init__ (self, cache=None):
+        """
+        Constructor.
+
+        :attr cache: <PackingCache> The cache of the packings made by this engine (if any).
+        """
+        self.cache = cache
+
+
+    @abc.abstractmethod
+    def pack (self, pallet, hosted):
+        """
+        This method places the cases of hosted into the pallet.
+
+        :param pallet: <Pallet> The pallet in which cases must be placed.
+        :param hosted: <Pallet | OrderLine> The pallet or orderline containing the cases to place.
+        :return: <bool> True if the packing has been successful and False otherwise.
+        """
+
+
+
+class DubeEngine (PackerEngine):
+    """
+    The engine based on the packing.packer.dubePacker, which tries all the
+    extreme points of the pallet.
+    """
+    def __init__ (self, cache_maxbytes=DEFAULT_MAX_BYTES, vectorized=False, blocks=False):
+        """
+        Constructor.
+
+        :param cache_maxbytes: <int> The memory (in bytes) used to cache the results of
+                        the packer (if 0 or None, the results are not cached).
+        :attr vectorized: <bool> True to use the vectorized mode of the packer.
+        :attr blocks: <bool> True to use the block mode of the packer.
+        """
+        super().__init__(PackingCache(cache_maxbytes) if cache_maxbytes else None)
+        self.vectorized = vectorized
+        self.blocks = blocks
+
+
+    def pack (self, pallet, hosted):
+        done, _, _ = dubePacker(pallet, hosted, self.cache, self.vectorized, self.blocks)
+        return done
+
+
+
+class LayerEngine (PackerEngine):
+    """
+    The engine based on the packing.layers.layerPacker, which builds the pallet
+    by rows and layers. It is much faster than the DubeEngine, but it produces
+    less dense pallets.
+
+    Since some orderlines do not fit in a pallet by rows and layers, when the
+    cases cannot be packed into an empty pallet, they are packed by the
+    packing.packer.dubePacker, so that a pallet can always be built for an
+    orderline. The next cases are then placed in new layers above them.
+    """
+    def pack (self, pallet, hosted):
+        done, _, _ = layerPacker(pallet, hosted)
+        if not done and not pallet.cases:
+            done, _, _ = dubePacker(pallet, hosted)
+        return done
@@ -0,0 +1,144 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import collections
+import operator
+
+
+# The summary statistics of the cases on a pallet used by the filters:
+#   - tall: the footprint of the cases higher than half the pallet
+#   - wideX: the section of the cases longer than half the pallet along the X-axis
+#   - wideY: the section of the cases longer than half the pallet along the Y-axis
+#   - stackable: the number of cases that can hold something above
+#   - footprint: the footprint of all the cases
+Summary = collections.namedtuple("Summary", ("tall", "wideX", "wideY", "stackable", "footprint"))
+
+
+
+def summary (pallet):
+    """
+    This method returns the summary statistics of the cases on a pallet.
+    They are computed only once, and saved on the pallet. When the pallet receives
+    new cases, they must be updated through the merge method.
+
+    :param pallet: <Pallet> The pallet.
+    :return: <Summary> The summary statistics.
+    """
+    if pallet.summary is None:
+        X, Y, Z = pallet.size
+        tall = wideX = wideY = stackable = footprint = 0
+        for c in pallet.cases:
+            area, side = c.sizex * c.sizey, min(c.sizex, c.sizey)
+            footprint += area
+            if 2 * c.sizez > Z:
+                tall += area
+            if 2 * side > X:
+                wideX += side * c.sizez
+            if 2 * side > Y:
+                wideY += side * c.sizez
+            if c.strength > 0:
+                stackable += 1
+        pallet.summary = Summary(tall, wideX, wideY, stackable, footprint)
+    return pallet.summary
+
+
+
+def merge (host, hosted):
+    """
+    This method updates the summary statistics of a pallet after the cases of
+    another pallet have been packed into it.
+
+    :param host: <Pallet> The pallet that received the cases.
+    :param hosted: <Pallet> The pallet whose cases have been received.
+    """
+    host.summary = Summary(*map(operator.add, summary(host), summary(hosted)))
+
+
+
+# The filters below are necessary conditions for the merging of two pallets.
+# Each of them returns True when the cases of both pallets certainly cannot be
+# packed together, whatever the positions assigned by the packer. They are
+# evaluated on the summary statistics, without trying any packing.
+
+def volumeFilter (host, hosted):
+    """
+    The cases cannot exceed the volume of the pallet.
+    """
+    return host.volume + hosted.volume > host.maxVolume
+
+
+
+def weightFilter (host, hosted):
+    """
+    The cases cannot exceed the maximum weight of the pallet.
+    """
+    return host.weight + hosted.weight > host.maxWeight
+
+
+
+def tallFilter (host, hosted):
+    """
+    The cases higher than half the pallet all cross its middle horizontal plane,
+    hence they cannot overlap on the floor.
+    """
+    X, Y, Z = host.size
+    return summary(host).tall + summary(hosted).tall > X * Y
+
+
+
+def wideFilter (host, hosted):
+    """
+    The cases longer than half the pallet along one axis, in both their rotations,
+    all cross its middle vertical plane on that axis, hence their sections on that
+    plane cannot overlap.
+    """
+    X, Y, Z = host.size
+    s1, s2 = summary(host), summary(hosted)
+    return s1.wideX + s2.wideX > Y * Z or s1.wideY + s2.wideY > X * Z
+
+
+
+def stackFilter (host, hosted):
+    """
+    If no case can hold anything above, all the cases must lie on the floor.
+    """
+    X, Y, Z = host.size
+    s1, s2 = summary(host), summary(hosted)
+    return s1.stackable + s2.stackable == 0 and s1.footprint + s2.footprint > X * Y
+
+
+
+# The filters in the order in which they are evaluated (i.e., from the cheapest)
+FILTERS = (
+    ("volume", volumeFilter),
+    ("weight", weightFilter),
+    ("tall", tallFilter),
+    ("wide", wideFilter),
+    ("stack", stackFilter),
+)
+
+
+
+def reject (host, hosted, filters=FILTERS):
+    """
+    This method verifies the necessary conditions for the merging of two pallets.
+
+    :param host: <Pallet> The pallet that should receive the cases.
+    :param hosted: <Pallet> The pallet whose cases should be moved.
+    :param filters: <tuple> The filters to evaluate as (name, filter).
+    :return: <str> The name of the first filter that rejects the merging,
+            or None if the merging may be feasible.
+    """
+    for name, check in filters:
+        if check(host, hosted):
+            return name
+    return None
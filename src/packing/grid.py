@@ -0,0 +1,177 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import math
+import itertools
+
+from .points import contains
+
+
+# The number of cells in which each side of the pallet is divided.
+GRID_DIVISIONS = 10
+
+
+
+class SpatialGrid (object):
+    """
+    An instance of this class is a uniform 3-dimensional grid built over a pallet.
+    Each cell keeps the indexes of the packed cases that overlap it, so that the
+    packer can retrieve only the cases close to a given position instead of
+    iterating all of them.
+
+    The cases are indexed in the order in which they are added, which is the order
+    in which they have been packed. Queries return them in the same order.
+    """
+    def __init__ (self, size, divisions=GRID_DIVISIONS):
+        """
+        Constructor.
+
+        :param size: <tuple<int>> The size of the pallet.
+        :param divisions: <int> The number of cells along each side of the pallet.
+        """
+        self.size = size
+        self.divisions = divisions
+        self.cellSize = tuple(s / divisions for s in size)
+        # The cells of the grid, plus the aggregations of the cells along each axis,
+        # used to answer queries over slabs of the pallet with few lookups.
+        # They are created only when a case is indexed into them.
+        self.cells = {}
+        self.columns = {}    # Indexed by (x, y)
+        self.rows = {}       # Indexed by (y, z)
+        self.bands = {}      # Indexed by (x, z)
+        self.cases = []
+
+
+    def __len__ (self):
+        return len(self.cases)
+
+
+    def _span (self, low, high, axis):
+        """
+        Returns the range of cells that overlap the interval [low, high)
+        along the given axis.
+        """
+        c, d = self.cellSize[axis], self.divisions
+        return range(max(0, int(low // c)), min(d, math.ceil(high / c)))
+
+
+    def _lists (self, case):
+        """
+        Returns all the lists of the grid in which a case is indexed.
+        """
+        d = self.divisions
+        cells, columns, rows, bands = self.cells, self.columns, self.rows, self.bands
+        xs = self._span(case.x, case.right, 0)
+        ys = self._span(case.y, case.back, 1)
+        zs = self._span(case.z, case.top, 2)
+        lists = [columns.setdefault(i * d + j, []) for i in xs for j in ys]
+        lists.extend(cells.setdefault((i * d + j) * d + k, []) for i in xs for j in ys for k in zs)
+        lists.extend(rows.setdefault(j * d + k, []) for k in zs for j in ys)
+        lists.extend(bands.setdefault(i * d + k, []) for k in zs for i in xs)
+        return lists
+
+
+    def add (self, case):
+        """
+        Add a packed case to the grid.
+
+        :param case: <Case> The case just packed.
+        """
+        idx = len(self.cases)
+        self.cases.append(case)
+        for lst in self._lists(case):
+            lst.append(idx)
+
+
+    def sync (self, packed):
+        """
+        Add to the grid the packed cases not yet indexed.
+
+        :param packed: <deque<Case>> The cases packed in the pallet, in the order in
+                        which they have been packed.
+        """
+        for case in itertools.islice(packed, len(self.cases), None):
+            self.add(case)
+
+
+    def truncate (self, n):
+        """
+        Remove from the grid the cases added after the first n.
+        Since the cases are always added at the end of the lists, they are
+        removed popping the last element of each list they are indexed in.
+
+        :param n: <int> The number of cases to keep.
+        """
+        cases = self.cases
+        while len(cases) > n:
+            for lst in self._lists(cases.pop()):
+                lst.pop()
+
+
+    def covers (self, point, n):
+        """
+        Returns True if the point is inside one of the first n cases of the grid.
+
+        :param point: <tuple> The point.
+        :param n: <int> The number of cases to consider.
+        """
+        d, cases = self.divisions, self.cases
+        i, j, k = (min(d - 1, int(point[axis] // self.cellSize[axis])) for axis in range(3))
+        return any(idx < n and contains(cases[idx], point) for idx in self.cells.get((i * d + j) * d + k, ()))
+
+
+    @staticmethod
+    def _collect (found, lists, first, second, d):
+        """
+        Update the set found with the indexes of the cases kept in the lists
+        of a 2-dimensional aggregation of the grid.
+        """
+        for i in first:
+            for j in second:
+                found.update(lists.get(i * d + j, ()))
+
+
+    def neighbours (self, case, obstructionRisk):
+        """
+        This method returns all the packed cases that may intersect, support, or
+        obstruct the placement of a case in its current position, in the order
+        in which they have been packed.
+        Other cases are ignored, because they would not produce any effect on
+        the feasibility check of the placement.
+
+        :param case: <Case> The case to place.
+        :param obstructionRisk: <bool> True if the case to place is not on the side
+                                of the pallet and obstructions must be verified.
+        :return: <list<Case>> The cases to consider.
+        """
+        d, cz = self.divisions, self.cellSize[2]
+        xs, ys = self._span(case.x, case.right, 0), self._span(case.y, case.back, 1)
+        found = set()
+        if obstructionRisk:
+            # The columns over the footprint of the case (i.e., cases that intersect,
+            # support, or are above it), and the slabs along the X and Y axes.
+            zs = self._span(case.z, case.top, 2)
+            self._collect(found, self.columns, xs, ys, d)
+            self._collect(found, self.rows, ys, zs, d)
+            self._collect(found, self.bands, xs, zs, d)
+        else:
+            # The cases below whose top is at the same height of the case to place
+            # belong to the cell immediately below its bottom.
+            zs = range(max(0, math.ceil(case.z / cz) - 1), self._span(case.z, case.top, 2).stop)
+            cells = self.cells
+            for i in xs:
+                for j in ys:
+                    base = (i * d + j) * d
+                    for k in zs:
+                        found.update(cells.get(base + k, ()))
+        cases = self.cases
+        return [cases[i] for i in sorted(found)]
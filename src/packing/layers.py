@@ -0,0 +1,111 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import operator
+
+from .case import rotate
+from .packer import fit, _rollback, GRID_MIN_CASES
+
+
+
+def layerPacker (pallet, hosted):
+    """
+     This method implements a layer-building heuristic, much faster than the
+     packing.packer.dubePacker, at the cost of a lower density of the pallets.
+
+     The cases are placed side by side along the X-axis to form a row, the rows
+     are placed one after the other along the Y-axis to form a layer, and the
+     layers are placed one above the other. Each case is placed in the first
+     of these positions (continuing the current row, starting a new row, or
+     starting a new layer) where it fits, with or without rotation, so, instead
+     of trying all the extreme points of the pallet, only 3 positions are tried.
+     The rotation tried first is the one that fits more cases in a layer of the
+     pallet, so that identical cases form rows and layers as dense as possible.
+     Each position is verified through the packing.packer.fit method, hence the
+     same stability, strength, and obstruction rules of the dubePacker are respected.
+
+     The position where the next case will be placed is saved on the pallet, so that
+     other cases can be added later on. As in the dubePacker, the pallet is modified
+     only if the packing is successful.
+
+     :param pallet: <Pallet> The pallet in which cases must be placed.
+     :param hosted: <Pallet | OrderLine> The pallet or orderline containing the cases to place .
+
+     :return: <tuple> The first element is True if the packing has been successful
+                and False otherwise, the second returns the cases of the pallet, while,
+                the third element is the layersMap of the pallet.
+
+    """
+    X, Y, Z = pallet.size
+    packed, layersMap = pallet.cases, pallet.layersMap
+
+    # Sort cases for decreasing strength
+    sortedCases = sorted(hosted, key=operator.attrgetter('strength'), reverse=True)
+
+    # Initialize the undo log (see packing.packer.dubePacker)
+    n = len(packed)
+    layers = {c.orderline: layersMap.get(c.orderline) for c in sortedCases}
+
+    # Read the current row and layer. If the pallet has not been packed by this method,
+    # a new layer is started above all its cases.
+    shelf = pallet.shelf
+    if shelf is None:
+        shelf = (0, 0, max((c.top for c in packed), default=0), 0, 0)
+    # The position of the next case, and the depth of the current row and the height
+    # of the current layer.
+    x, y, z, depth, height = shelf
+
+    for currentItem in sortedCases:
+        currentItem = currentItem.__copy__()
+        # Start from the rotation that fits more cases in a layer
+        if (X // currentItem.sizey) * (Y // currentItem.sizex) > (X // currentItem.sizex) * (Y // currentItem.sizey):
+            rotate(currentItem)
+
+        # Use the spatial grid if the pallet has enough cases
+        grid = None
+        if len(packed) >= GRID_MIN_CASES:
+            grid = pallet.grid
+            grid.sync(packed)
+
+        # Try to continue the current row, to start a new row, or to start a new layer.
+        placed = None
+        for index, pivot in enumerate(((x, y, z), (0, y + depth, z), (0, 0, z + height))):
+            currentItem.setPosition(pivot)
+            # Try the two possible rotations
+            for _ in range(2):
+                if fit(currentItem, pallet, packed, layersMap, grid):
+                    placed = index
+                    break
+                rotate(currentItem)
+            if placed is not None:
+                break
+
+        # If the case cannot be placed the packing is not feasible.
+        if placed is None:
+            _rollback(pallet, n, layers)
+            return False, packed, layersMap
+
+        # Update the current row and layer
+        if placed == 1:
+            y, depth = y + depth, 0
+        elif placed == 2:
+            z, y, depth, height = z + height, 0, 0, 0
+        x = currentItem.right
+        depth = max(depth, currentItem.sizey)
+        height = max(height, currentItem.sizez)
+        packed.append(currentItem)
+
+    # Save the current row and layer, and reset the key and the cost of the content
+    pallet.shelf = (x, y, z, depth, height)
+    pallet.contentKey = pallet.routeCost = None
+
+    return True, packed, layersMap
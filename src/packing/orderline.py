@@ -32,6 +32,8 @@ class OrderLine (object):
     An instance of this class represents a customer orderline.
 
     """
+    __slots__ = ("__i", "code", "location", "cases", "weight", "volume", "pallet", "dn_edge", "nd_edge")
+
     def __init__ (self, code, location, cases=None):
         """
         Constructor.
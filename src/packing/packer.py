@@ -15,11 +15,11 @@ Author' contact: mattianeroni93@gmail.com
 %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
 """
 import operator
-import collections
-import functools
+import itertools
 
 from .case import rotate
-from .pallet import HashableDict
+from .cache import packingKey
+from .vectorized import CaseArrays, findPlacement
 
 
 # Initialize the parameters of the algorithm
@@ -28,6 +28,15 @@ from .pallet import HashableDict
 MIN_STABLE_SURFACE = 0.7
 MIN_STABLE_CORNERS = 3
 
+# The minimum number of cases on a pallet to use its spatial grid.
+# For fewer cases, iterating all of them is faster.
+GRID_MIN_CASES = 16
+
+# The minimum number of candidate points on a pallet to use the vectorized mode.
+# With fewer points, the standard mode usually finds a position in a few tries
+# and the overhead of NumPy is higher than the gain.
+VECTORIZED_MIN_POINTS = 96
+
 
 
 def getPosition (index, item):
@@ -126,11 +135,12 @@ def check_obstruction (toplace, obstructor, obstructionRisk, possibleInserts, in
 
 
 
-def fit (currentItem, pallet, packed, layersMap):
+def fit (currentItem, pallet, packed, layersMap, grid=None):
     """
      This method verifies if it is possible to place the currentItem in a given position.
      The method needs to iterate all the list of already packed items to avoid overlaps
-     or intersections.
+     or intersections. When a spatial grid is provided, only the packed items close
+     enough to intersect, support, or obstruct the currentItem are iterated.
      It also verifies the stability of cases, the vertical support, and the strength constraint.
 
      :param currentItem: <Case> The case to place
@@ -138,6 +148,7 @@ def fit (currentItem, pallet, packed, layersMap):
      :param packed: <list<Case>> The set of already packed cases in that pallet
      :param layersMap: <dict> A copy of the layersMap of the pallet used to keep track
                         of orderlines level (i.e., order in which they can be placed).
+     :param grid: <SpatialGrid> The spatial index of the packed cases (optional).
 
      :return: True if the placement is possible and False otherwise.
 
@@ -149,6 +160,10 @@ def fit (currentItem, pallet, packed, layersMap):
     if right > X or back > Y or currentItem.top > Z:
         return False
 
+    # The number of cases the currentItem can hold above is set from scratch
+    # in each position, so that it does not depend on the positions tried before.
+    currentItem.canHold = currentItem.strength
+
     # Initialize the stable surface and the stable corners of the currentItem
     # In a feasible packing, a case must have 3 out of 4 corners, or,
     # alternatively, the 70% of its surface lying on a case underneath.
@@ -179,6 +194,21 @@ def fit (currentItem, pallet, packed, layersMap):
         (right, front)
     ]
 
+    # Check if the currentItem has physical support...
+    if currentItem.z == 0:
+        # If the currentItem is on the floor and has no intersections
+        # the placement is feasible.
+        stableSurface = itemSurface
+        stableCorners = [1,1,1,1]
+        sumStables = 4
+        stable = True
+        # Update the layer of the currentItem
+        layer = max(layer, 0)
+
+    # Only the packed items close to currentItem are iterated when the grid is available
+    if grid is not None:
+        packed = grid.neighbours(currentItem, obstructRisk)
+
     for packedItem in packed:
         # Check intersection with other already placed cases.
         #if intersect(currentItem, packedItem):
@@ -190,19 +220,7 @@ def fit (currentItem, pallet, packed, layersMap):
         if intersection or insertsSum == 0:
             return False
 
-
-        # Check if the currentItem has physical support...
-        if not stable and currentItem.z == 0:
-            # If the currentItem is on the floor and has no intersections
-            # the placement is feasible.
-            stableSurface = itemSurface
-            stableCorners = [1,1,1,1]
-            sumStables = 4
-            stable = True
-            # Update the layer of the currentItem
-            layer = max(layer, 0)
-
-        elif currentItem.z == packedItem.top:
+        if currentItem.z == packedItem.top:
             # If currentItem will lay on another case...
             x1 = min(right, packedItem.right); x2 = max(left, packedItem.left)
             y1 = min(back, packedItem.back); y2 = max(front, packedItem.front)
@@ -248,8 +266,157 @@ def fit (currentItem, pallet, packed, layersMap):
 
 
 
-@functools.lru_cache(maxsize=1024)
-def dubePacker (pallet, hosted):
+def _rollback (pallet, n, layers):
+    """
+     This method restores a pallet to the state it had before a failed packing,
+     using the undo log kept by the dubePacker.
+
+     :param pallet: <Pallet> The pallet to restore.
+     :param n: <int> The number of cases the pallet had before the packing.
+     :param layers: <dict> The layers the packed orderlines had before the packing
+                    (None if they were not in the layersMap).
+    """
+    packed, layersMap = pallet.cases, pallet.layersMap
+    while len(packed) > n:
+        packed.pop()
+    pallet.grid.truncate(n)
+    pallet.points.truncate(n)
+    if pallet.arrays is not None:
+        pallet.arrays.truncate(n)
+
+    for orderline, layer in layers.items():
+        if layer is None:
+            layersMap.pop(orderline, None)
+        else:
+            layersMap[orderline] = layer
+
+
+
+def _restore (pallet, sortedCases, lines, result):
+    """
+     This method packs the cases into a pallet as described by a successful
+     result saved in the packing cache.
+
+     :param pallet: <Pallet> The pallet in which cases must be placed.
+     :param sortedCases: <list<Case>> The cases to place in the order in which they are placed.
+     :param lines: <list<OrderLine>> The orderlines in the order they appear into the key of the packing.
+     :param result: <tuple> The positions of the cases and the layers of the orderlines.
+    """
+    packed, layersMap = pallet.cases, pallet.layersMap
+    positions, layers = result
+    pallet.contentKey = pallet.routeCost = None
+
+    for i, currentItem in enumerate(sortedCases):
+        currentItem = currentItem.__copy__()
+        (currentItem.x, currentItem.y, currentItem.z, currentItem.sizex,
+            currentItem.sizey, currentItem.rotated, currentItem.canHold) = positions[7 * i : 7 * i + 7]
+        packed.append(currentItem)
+
+    for i in range(0, len(layers), 2):
+        layersMap[lines[layers[i]]] = layers[i + 1]
+
+
+
+def _sameCase (case, other):
+    """
+     This method returns True if two cases are identical (i.e., same orderline, code,
+     dimensions, and strength), and, therefore, they can be part of the same block.
+     If the two cases have a different rotation, the first one is rotated.
+    """
+    if case.orderline is not other.orderline or case.code != other.code \
+            or case.sizez != other.sizez or case.strength != other.strength:
+        return False
+    if case.rotated != other.rotated:
+        rotate(case)
+    if case.sizex == other.sizex and case.sizey == other.sizey:
+        return True
+    rotate(case)
+    return False
+
+
+
+def _placeBlock (first, sortedCases, start, pallet, packed):
+    """
+     This method places the identical cases (see _sameCase) that follow a case just
+     packed as a block built around it: rows along the X-axis, rows one after the other
+     along the Y-axis, and layers one above the other.
+
+     The size of the block is defined at once, checking the conditions of the fit method
+     on whole rows and layers instead of on each case. The block is limited by the sides
+     of the pallet, by the packed cases that intersect it or lay above it, and by the
+     strength of the cases. The rows stop before the cases above them, and the block has
+     a single layer if a case is above the first one, so that nothing is ever above the
+     cases of the block, and each of them can always be inserted from above. If the
+     first case lays on the floor, the cases of the first layer lay on the floor too,
+     otherwise the block is a column over the first case, so that each case of a layer
+     is completely supported by the identical case below it, and it can hold one case
+     less. The block is filled layer by layer, and each layer row by row.
+
+     :param first: <Case> The case just packed, which is the last one of the pallet.
+     :param sortedCases: <list<Case>> The cases to place in the order in which they are placed.
+     :param start: <int> The index of the case after the first one in sortedCases.
+     :param pallet: <Pallet> The pallet in which the cases must be placed.
+     :param packed: <list<Case>> The set of already packed cases in that pallet.
+     :return: <int> The number of cases placed after the first one.
+    """
+    # The identical cases that follow the first one, with its same orientation
+    run = []
+    for case in itertools.islice(sortedCases, start, None):
+        case = case.__copy__()
+        if not _sameCase(case, first):
+            break
+        run.append(case)
+    if not run:
+        return 0
+
+    X, Y, Z = pallet.size
+    x0, y0, z0 = first.x, first.y, first.z
+    sx, sy, sz = first.sizex, first.sizey, first.sizez
+    total = len(run) + 1
+    others = tuple(itertools.islice(packed, len(packed) - 1))
+
+    # The cases in each row, limited by the cases that intersect or are above the row
+    nx = min(total, (X - x0) // sx) if z0 == 0 else 1
+    for c in others:
+        if c.top > z0 and c.y < y0 + sy and c.back > y0 and c.x < x0 + nx * sx and c.right > x0 + sx:
+            nx = min(nx, max(1, (c.x - x0) // sx))
+
+    # The rows in each layer, limited in the same way
+    ny = min(-(-total // nx), (Y - y0) // sy) if z0 == 0 else 1
+    for c in others:
+        if c.top > z0 and c.x < x0 + nx * sx and c.right > x0 and c.y < y0 + ny * sy and c.back > y0 + sy:
+            ny = min(ny, max(1, (c.y - y0) // sy))
+
+    # The layers, unless a case is above the first layer
+    nz = min(-(-total // (nx * ny)), (Z - z0) // sz)
+    for c in others:
+        if c.top > z0 + sz and c.x < x0 + nx * sx and c.right > x0 and c.y < y0 + ny * sy and c.back > y0:
+            nz = 1
+            break
+
+    placed, canHold = 0, first.canHold
+    for l in range(nz):
+        if l > 0:
+            # Each layer must be held by the layer below
+            if canHold == 0:
+                break
+            canHold = min(first.strength, canHold - 1)
+        for j in range(ny):
+            for i in range(nx):
+                if (i, j, l) == (0, 0, 0):
+                    continue
+                if placed == len(run):
+                    return placed
+                case = run[placed]
+                case.setPosition((x0 + i * sx, y0 + j * sy, z0 + l * sz))
+                case.canHold = canHold
+                packed.append(case)
+                placed += 1
+    return placed
+
+
+
+def dubePacker (pallet, hosted, cache=None, vectorized=False, blocks=False):
     """
      The algorithm implemented in this method is a modified version of the one proposed by:
      Dube, E., Kanavathy, L. R., & Woodview, P. (2006). Optimizing Three-Dimensional
@@ -262,32 +429,82 @@ def dubePacker (pallet, hosted):
         - Actual possibility to place cases in a given position (obstructions during the
           placement)
 
+     The cases are packed directly into the pallet, which is therefore modified only
+     if the packing is successful. The number of cases on the pallet and every change
+     made to its layersMap are saved in an undo log, and, if the packing fails, the pallet
+     is restored to its previous state. In this way, the cases already on the pallet
+     are never copied.
+
+     The positions tried for each case are the extreme points of the pallet, which are
+     maintained together with its cases (see packing.points). The points that can never
+     host a case (i.e., covered by another case, outside the pallet, or on top of a case
+     that cannot hold anything) are discarded once, instead of being checked again for
+     each case to place.
+
+     If a cache is provided, the result of the packing is saved using as key the content
+     of the pallet and the cases to place, and the packing is not repeated when the
+     same key is met again.
+
+     In the vectorized mode, the packed cases are also kept as NumPy arrays, and all the
+     candidate positions and rotations of a case are evaluated together (see
+     packing.vectorized). The first feasible position, in the same order used by the
+     standard mode, is then checked once more through the fit method, which sets the
+     strength and the layer of the case. The result is the same of the standard mode,
+     which is still used when the pallet has few candidate points.
+
+     In the block mode, identical cases (see _sameCase) are placed as blocks: after a
+     case has been placed, the identical cases that follow it are placed all together
+     in rows and layers around it, whose feasibility is verified once per row and layer
+     (see _placeBlock), and only the cases that do not fit in the block are placed in
+     the extreme points. The result may be different from the standard mode, so a cache
+     should not be shared between packings made with and without blocks.
+
 
      :param pallet: <Pallet> The pallet in which cases must be placed.
      :param hosted: <Pallet | OrderLine> The pallet or orderline containing the cases to place .
+     :param cache: <PackingCache> The cache of the packings (optional).
+     :param vectorized: <bool> True to use the vectorized mode.
+     :param blocks: <bool> True to use the block mode.
 
      :return: <tuple> The first element is True if the packing has been successful
-                and False otherwise, the second returns the set of packed items with
+                and False otherwise, the second returns the cases of the pallet with
                 the attributes and characteristichs they assumed during the packing
-                (note at the beginning a copy of hosted cases is made), while, the
-                third element is the new layersMap of the pallet.
+                (note a copy of hosted cases is made before placing them), while, the
+                third element is the layersMap of the pallet.
 
     """
-    # Copy pallet's data
+    # Get pallet's data
     X, Y, Z = pallet.size
-    packed = collections.deque([c.__copy__() for c in pallet.cases])
-
-    # Initialize the layers map in which it will be saved the layer
-    # corresponding to each OrderLine
-    layersMap = HashableDict(pallet.layersMap)
+    packed, layersMap = pallet.cases, pallet.layersMap
+    if vectorized and pallet.arrays is None:
+        pallet.arrays = CaseArrays()
 
     # Sort cases for decreasing strength
     sortedCases = sorted(hosted, key=operator.attrgetter('strength'), reverse=True)
 
+    # Eventually read the result from the cache
+    if cache is not None:
+        key, lines = packingKey(pallet, sortedCases)
+        result = cache.get(key)
+        if result is not None:
+            if result:
+                _restore(pallet, sortedCases, lines, result)
+            return bool(result), packed, layersMap
+
+    # Initialize the undo log: the number of cases on the pallet, and the previous layers
+    # of the orderlines to pack.
+    n = len(packed)
+    layers = {c.orderline: layersMap.get(c.orderline) for c in sortedCases}
+
+    # The number of the next cases already placed in a block (see _placeBlock)
+    placedAhead = 0
+
     # For each item to pack
-    for currentItem in sortedCases:
+    for index, currentItem in enumerate(sortedCases):
+        if placedAhead:
+            placedAhead -= 1
+            continue
         currentItem = currentItem.__copy__()
-        currentItem.busyCorners = [False, False, False]
         currentItem.canHold = currentItem.strength
 
         if len(packed) == 0:
@@ -297,51 +514,86 @@ def dubePacker (pallet, hosted):
 
             # Interrupt immediately if the packing is already not feasible
             if currentItem.top > Z:
+                _rollback(pallet, n, layers)
+                if cache is not None: cache.put(key, False)
                 return False, packed, layersMap
 
             if currentItem.right > X or currentItem.back > Y:
                 rotate(currentItem)
                 if currentItem.right > X or currentItem.back > Y:
+                    _rollback(pallet, n, layers)
+                    if cache is not None: cache.put(key, False)
                     return False, packed, layersMap
             # Add item to the list of packed and update the layers map
             layersMap[currentItem.orderline] = 0
             packed.append(currentItem)
+            if blocks: placedAhead = _placeBlock(currentItem, sortedCases, index + 1, pallet, packed)
         else:
             toPack = True
-            # Try the three positions close to the already packed items
-            # and in each position try the two possible rotations.
-            # We first try floor positions for all items. The beginning of a new
-            # level is the last thing we try.
-            for posIndex in range(3):
-                # For each packed case
-                for packedItem in packed:
-                    # If the corner is already busy no further chack is made.
-                    if packedItem.busyCorners[posIndex]:
-                        continue
+            # Use the spatial grid if the pallet has enough cases
+            grid = None
+            if len(packed) >= GRID_MIN_CASES:
+                grid = pallet.grid
+                grid.sync(packed)
+
+            # Update the extreme points with the last packed cases
+            points = pallet.points
+            points.sync(packed, grid)
+
+            if vectorized and points.count() >= VECTORIZED_MIN_POINTS:
+                # Evaluate all the positions together and verify the first feasible
+                pallet.arrays.sync(packed)
+                placement = findPlacement(currentItem, pallet.arrays, points, pallet.size, MIN_STABLE_SURFACE, MIN_STABLE_CORNERS)
+                if placement is not None:
+                    pivot, rotated = placement
+                    if rotated:
+                        rotate(currentItem)
+                    currentItem.setPosition(pivot)
+                    feasible = fit(currentItem, pallet, packed, layersMap, grid)
+                    assert feasible == True
+                    toPack = False
+            else:
+                # Try the extreme points (i.e., the free corners of the already packed items),
+                # and in each position try the two possible rotations.
+                # We first try floor positions for all items. The beginning of a new
+                # level is the last thing we try.
+                for posIndex, idx, pivot in points:
                     # Set the currentItem in a certain position
-                    pivot = getPosition(posIndex, packedItem)
                     currentItem.setPosition(pivot)
                     # Try the two possible rotations
-                    if fit(currentItem, pallet, packed, layersMap):
+                    if fit(currentItem, pallet, packed, layersMap, grid):
                         toPack = False
-                        packedItem.busyCorners[posIndex] = True
                         break
                     # Eventually try same position rotating the case
                     rotate(currentItem)
-                    if fit(currentItem, pallet, packed, layersMap):
+                    if fit(currentItem, pallet, packed, layersMap, grid):
                         toPack = False
-                        packedItem.busyCorners[posIndex] = True
                         break
                     # Readjust the item
                     rotate(currentItem)
 
-                # If already packed we don't need to try other positions.
-                if not toPack: break
-
             # If all positions have been tried and the packing is not possible
             # there is no feasible solution.
-            if toPack: return False, packed, layersMap
+            if toPack:
+                _rollback(pallet, n, layers)
+                if cache is not None: cache.put(key, False)
+                return False, packed, layersMap
             # If currentItem has been packed add it to the list of packed
             packed.append(currentItem)
+            # The identical cases that follow are placed in a block around it
+            if blocks: placedAhead = _placeBlock(currentItem, sortedCases, index + 1, pallet, packed)
+
+    # The content of the pallet has changed
+    pallet.contentKey = pallet.routeCost = None
+
+    # Save the result into the cache
+    if cache is not None:
+        positions = tuple(v for c in itertools.islice(packed, n, None)
+                          for v in (c.x, c.y, c.z, c.sizex, c.sizey, c.rotated, c.canHold))
+        lineIds = {id(line): i for i, line in enumerate(lines)}
+        cache.put(key, (
+            positions,
+            tuple(v for line in layers for v in (lineIds[id(line)], layersMap[line]))
+        ))
 
     return True, packed, layersMap
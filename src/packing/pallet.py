@@ -18,6 +18,9 @@ import collections
 import functools
 import operator
 
+from .grid import SpatialGrid
+from .points import ExtremePoints
+
 # Standard pallets' characteristics
 PALLET_SIZE = (120, 80, 150)
 PALLET_MAX_WEIGHT = 450
@@ -27,7 +30,7 @@ PALLET_MAX_WEIGHT = 450
 class HashableDict (dict):
     """
     Implementation of a hashable dictionary. This implementation is needed to make
-    pallets hashable and caching the packing function.
+    pallets hashable.
     """
     def __hash__(self):
         return hash(tuple(sorted(self.items())))
@@ -37,6 +40,9 @@ class Pallet (object):
     """
     An instance of this class represents a pallet.
     """
+    __slots__ = ("__i", "size", "maxWeight", "maxVolume", "cases", "layersMap", "grid", "points",
+                 "arrays", "contentKey", "summary", "shelf", "signature", "orderlines", "sorted_orderlines", "weight",
+                 "volume", "active", "routeCost", "snapshots")
 
     def __init__ (self, size, max_weight):
         """
@@ -45,6 +51,25 @@ class Pallet (object):
                         This is very important to understand in which order the storage
                         locations can be visited.
         :attr orderlines: <set<OrderLine>> the set of orderlines kept into this pallet.
+        :attr grid: <SpatialGrid> the spatial index of the cases, maintained by the packer
+                    together with the cases and the layersMap.
+        :attr points: <ExtremePoints> the extreme points where new cases can be placed,
+                    maintained by the packer like the spatial grid.
+        :attr arrays: <CaseArrays> the cases as NumPy arrays, used and maintained only by
+                    the vectorized mode of the packer.
+        :attr contentKey: <tuple> the part of the packing key that depends on the content of
+                    the pallet (see packing.cache.packingKey), reset every time it changes.
+        :attr summary: <Summary> the summary statistics of the cases used to reject
+                    infeasible mergings without packing (see packing.filters).
+        :attr shelf: <tuple> the current row and layer of the pallet, used and maintained
+                    only by the layer-building packer (see packing.layers).
+        :attr signature: <int> the signature of the sequence of mergings the pallet has
+                    been built with (see packing.cache.InfeasibleCache), if known.
+        :attr routeCost: <float> the distance walked by the picker to build the pallet
+                    (see Solver.solutionCost), reset every time the content changes.
+        :attr snapshots: <list<tuple>> the number of orderlines and cases, the signature, and
+                    the shelf the pallet had after its creation and after each merging, used to
+                    recover the packing of its first orderlines (see Solver.destruction).
         """
         self.__i = 0             # Counter used to iterate the pallet cases
         self.size = size
@@ -52,15 +77,24 @@ class Pallet (object):
         self.maxVolume = functools.reduce(operator.mul, size, 1)
         self.cases = collections.deque()
         self.layersMap = HashableDict()
+        self.grid = SpatialGrid(size)
+        self.points = ExtremePoints(size)
+        self.arrays = None
+        self.contentKey = None
+        self.summary = None
+        self.shelf = None
+        self.signature = None
         self.orderlines = set()
         self.sorted_orderlines = []
         self.weight = 0
         self.volume = 0
         self.active = True       # Used only by the sequential procedure
+        self.routeCost = None
+        self.snapshots = []
 
     def __hash__ (self):
         """
-        Method implemented to make the pallet hashable for caching.
+        Method implemented to make the pallet hashable.
         """
         return hash(self.layersMap)
 
@@ -74,4 +108,12 @@ class Pallet (object):
         if self.__i < len(self.cases):
             self.__i += 1
             return self.cases[self.__i - 1]
-        raise StopIteration
\ No newline at end of file
+        raise StopIteration
+
+
+    def snapshot (self):
+        """
+        Save the current number of orderlines and cases, signature, and shelf of
+        the pallet (see snapshots).
+        """
+        self.snapshots.append((len(self.sorted_orderlines), len(self.cases), self.signature, self.shelf))
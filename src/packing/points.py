@@ -0,0 +1,149 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import bisect
+import itertools
+
+
+def contains (case, point):
+    """
+    Returns True if a point is inside a case, and, therefore, no other
+    case can be placed in that point.
+    """
+    x, y, z = point
+    return case.x <= x < case.x + case.sizex and case.y <= y < case.y + case.sizey and case.z <= z < case.z + case.sizez
+
+
+
+class ExtremePoints (object):
+    """
+    An instance of this class is the ordered set of the extreme points of a pallet,
+    i.e., the corners of the packed cases where a new case can still be placed.
+
+    The points are sorted as the packer tries them: first all the corners on the
+    right of the cases, then all the corners on the back, and finally all the corners
+    on the top, each time in the order in which the cases have been packed.
+
+    Every time a case is packed, the points it covers are removed, and its corners are
+    added, unless they are outside the pallet, already covered by another case, or on
+    top of a case that cannot hold anything. In all these cases, the placement of a
+    new case in that point would never be feasible.
+
+    Like the spatial grid, the set is maintained by the packer together with the cases of
+    the pallet, and the points removed are logged to restore them if the pallet is truncated.
+    """
+    def __init__ (self, size):
+        """
+        Constructor.
+
+        :param size: <tuple<int>> The size of the pallet.
+        """
+        self.size = size
+        self.n = 0
+        self.owners = ([], [], [])      # For each corner, the sorted indexes of the cases
+        self.pivots = ({}, {}, {})      # For each corner, the point of each case
+        self.removed = []               # The points removed as (index of the case, corner, owner)
+
+
+    def __len__ (self):
+        return self.n
+
+
+    def __iter__ (self):
+        """
+        Iterates the points as (corner, index of the case, point) in the order
+        in which they must be tried.
+        """
+        for posIndex in range(3):
+            pivots = self.pivots[posIndex]
+            for owner in self.owners[posIndex]:
+                yield posIndex, owner, pivots[owner]
+
+
+    def count (self):
+        """
+        Returns the number of points in the set.
+        """
+        return sum(len(owners) for owners in self.owners)
+
+
+    def add (self, case, packed, grid=None):
+        """
+        Update the set after the packing of a case.
+
+        :param case: <Case> The case just packed.
+        :param packed: <deque<Case>> The cases packed before it.
+        :param grid: <SpatialGrid> The spatial index of the packed cases (optional).
+        """
+        idx = self.n
+        X, Y, Z = self.size
+
+        # Remove the points covered by the new case
+        for posIndex in range(3):
+            owners, pivots = self.owners[posIndex], self.pivots[posIndex]
+            covered = [owner for owner in owners if contains(case, pivots[owner])]
+            if covered:
+                self.removed.extend((idx, posIndex, owner) for owner in covered)
+                covered = set(covered)
+                owners[:] = [owner for owner in owners if owner not in covered]
+
+        # Add the corners of the new case
+        corners = (
+            (case.x + case.sizex, case.y, case.z),
+            (case.x, case.y + case.sizey, case.z),
+            (case.x, case.y, case.z + case.sizez),
+        )
+        for posIndex, point in enumerate(corners):
+            if point[0] >= X or point[1] >= Y or point[2] >= Z:
+                continue
+            if posIndex == 2 and case.canHold == 0:
+                continue
+            if grid is not None and len(grid) >= idx:
+                if grid.covers(point, idx):
+                    continue
+            elif any(contains(c, point) for c in itertools.islice(packed, idx)):
+                continue
+            self.owners[posIndex].append(idx)
+            self.pivots[posIndex][idx] = point
+
+        self.n = idx + 1
+
+
+    def sync (self, packed, grid=None):
+        """
+        Update the set with the packed cases not yet considered.
+
+        :param packed: <deque<Case>> The cases packed in the pallet, in the order in
+                        which they have been packed.
+        :param grid: <SpatialGrid> The spatial index of the packed cases (optional).
+        """
+        for case in itertools.islice(packed, self.n, None):
+            self.add(case, packed, grid)
+
+
+    def truncate (self, n):
+        """
+        Restore the set as it was before the packing of the cases after the first n.
+
+        :param n: <int> The number of cases to keep.
+        """
+        if self.n <= n:
+            return
+        for owners, pivots in zip(self.owners, self.pivots):
+            while owners and owners[-1] >= n:
+                del pivots[owners.pop()]
+        removed = self.removed
+        while removed and removed[-1][0] >= n:
+            _, posIndex, owner = removed.pop()
+            if owner < n:
+                bisect.insort(self.owners[posIndex], owner)
+        self.n = n
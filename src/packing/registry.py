@@ -0,0 +1,135 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+
+
+class PalletRegistry (object):
+    """
+    An instance of this class is an indexed registry of the pallets of a solution
+    under construction, used to find the pallet of each orderline while the pallets
+    are merged.
+
+    The orderlines (identified by their index) are kept in a union-find structure,
+    where each set is made of the orderlines of a pallet, and the pallets are kept
+    in an array of slots, one for each pallet the solution started from. When two
+    pallets are merged, their sets are joined, and the slot of the hosted pallet
+    is freed. In this way, finding the pallet of an orderline, merging two pallets,
+    and removing a pallet cost O(1) amortized, and the orderlines are assigned to
+    their pallets only once at the end (see assign). The state of the registry is
+    made of flat lists, so it is saved and restored by copying them (see snapshot).
+    """
+    def __init__ (self, orderlines, palletsList):
+        """
+        Constructor.
+
+        :param orderlines: <tuple<OrderLine>> All the orderlines, in the order that defines their indexes.
+        :param palletsList: <list<Pallet>> The starting pallets.
+
+        :attr parent: <list<int>> For each orderline, its parent in the union-find structure.
+        :attr size: <list<int>> For each root, the number of orderlines in its set.
+        :attr slot: <list<int>> For each root, the slot of its pallet (-1 for the orderlines
+                    that are not in any pallet, e.g., the ones removed from the problem).
+        :attr pallets: <list<Pallet>> The pallets in their slots.
+        :attr alive: <list<bool>> For each slot, True if its pallet has not been merged into another one.
+        """
+        n = len(orderlines)
+        self.orderlines = orderlines
+        self.parent = list(range(n))
+        self.size = [1] * n
+        self.slot = [-1] * n
+        self.pallets = list(palletsList)
+        self.alive = [True] * len(self.pallets)
+
+        index = {id(line): i for i, line in enumerate(orderlines)}
+        parent, size, slot = self.parent, self.size, self.slot
+        for s, pallet in enumerate(self.pallets):
+            root = None
+            for line in pallet.orderlines:
+                i = index[id(line)]
+                if root is None:
+                    root = i
+                    slot[i] = s
+                else:
+                    parent[i] = root
+                    size[root] += 1
+
+
+    def find (self, i):
+        """
+        Returns the root of the set of an orderline (with path halving).
+
+        :param i: <int> The index of the orderline.
+        """
+        parent = self.parent
+        while (p := parent[i]) != i:
+            parent[i] = i = parent[p]
+        return i
+
+
+    def pallet (self, root):
+        """
+        Returns the pallet of a set of orderlines.
+
+        :param root: <int> The root of the set (see find).
+        """
+        return self.pallets[self.slot[root]]
+
+
+    def union (self, host, hosted):
+        """
+        Join the sets of two pallets after the hosted one has been merged into
+        the host, freeing the slot of the hosted pallet.
+
+        :param host: <int> The root of the set of the host pallet.
+        :param hosted: <int> The root of the set of the hosted pallet.
+        """
+        parent, size, slot = self.parent, self.size, self.slot
+        self.alive[slot[hosted]] = False
+        # The smallest set is attached to the largest one
+        if size[host] < size[hosted]:
+            slot[hosted] = slot[host]
+            host, hosted = hosted, host
+        parent[hosted] = host
+        size[host] += size[hosted]
+
+
+    def palletsList (self):
+        """
+        Returns the pallets not merged into other ones, in the order of their slots.
+        """
+        return [pallet for pallet, alive in zip(self.pallets, self.alive) if alive]
+
+
+    def assign (self):
+        """
+        Assigns each orderline to its pallet. The orderlines that are not in any
+        pallet are left untouched.
+        """
+        pallets, slot, find = self.pallets, self.slot, self.find
+        for i, line in enumerate(self.orderlines):
+            if (s := slot[find(i)]) >= 0:
+                line.pallet = pallets[s]
+
+
+    def snapshot (self):
+        """
+        Returns a copy of the state of the registry, that can be restored later on.
+        """
+        return list(self.parent), list(self.size), list(self.slot), list(self.alive)
+
+
+    def restore (self, snapshot):
+        """
+        Restores a state of the registry saved through the snapshot method. The same
+        snapshot can be restored many times.
+        """
+        self.parent, self.size, self.slot, self.alive = (list(i) for i in snapshot)
@@ -0,0 +1,173 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import itertools
+import numpy as np
+
+
+# The number of candidate positions evaluated together. The candidates are
+# evaluated in chunks to avoid building huge matrices when the first candidates
+# are already feasible.
+CHUNK_SIZE = 128
+
+
+
+class CaseArrays (object):
+    """
+    An instance of this class keeps the packed cases of a pallet as NumPy arrays,
+    in the order in which they have been packed.
+    Like the spatial grid, it is maintained by the packer together with the cases of
+    the pallet.
+    """
+    def __init__ (self, capacity=64):
+        """
+        Constructor.
+
+        :attr boxes: <numpy.array> For each case: left, front, bottom, right, back, top.
+        :attr canHold: <numpy.array> For each case, the number of cases it can hold above.
+        """
+        self.n = 0
+        self.boxes = np.zeros((capacity, 6))
+        self.canHold = np.zeros(capacity)
+
+
+    def __len__ (self):
+        return self.n
+
+
+    def add (self, case):
+        """
+        Add a packed case to the arrays.
+        """
+        n = self.n
+        if n == len(self.canHold):
+            self.boxes = np.concatenate((self.boxes, np.zeros_like(self.boxes)))
+            self.canHold = np.concatenate((self.canHold, np.zeros_like(self.canHold)))
+        self.boxes[n] = (case.x, case.y, case.z, case.x + case.sizex, case.y + case.sizey, case.z + case.sizez)
+        self.canHold[n] = case.canHold
+        self.n = n + 1
+
+
+    def sync (self, packed):
+        """
+        Add to the arrays the packed cases not yet included.
+        """
+        for case in itertools.islice(packed, self.n, None):
+            self.add(case)
+
+
+    def truncate (self, n):
+        """
+        Remove the cases added after the first n.
+        """
+        self.n = min(self.n, n)
+
+
+
+def _first (matrix):
+    """
+    Returns for each row of a boolean matrix the index of its first True
+    element, or the number of columns if there is not any.
+    """
+    return np.where(matrix.any(axis=1), matrix.argmax(axis=1), matrix.shape[1])
+
+
+
+def _evaluate (pivots, dims, arrays, size, minSurface, minCorners):
+    """
+    This method evaluates together the placement of a case in many candidate positions,
+    replicating exactly what the packing.packer.fit method would do in each of them.
+
+    :param pivots: <numpy.array> The candidate positions (K x 3).
+    :param dims: <numpy.array> The dimensions of the case in each candidate (K x 3).
+    :param arrays: <CaseArrays> The packed cases.
+    :param size: <tuple> The size of the pallet.
+    :return: <numpy.array> For each candidate, if the placement is feasible.
+    """
+    X, Y, Z = size
+    n = arrays.n
+    L, F, D, R, B, T = (arrays.boxes[:n, i] for i in range(6))
+    canHold = arrays.canHold[:n]
+
+    x, y, z = (pivots[:, i, None] for i in range(3))
+    right, back, top = x + dims[:, 0, None], y + dims[:, 1, None], z + dims[:, 2, None]
+
+    # Check the pallet borders
+    inside = (right[:, 0] <= X) & (back[:, 0] <= Y) & (top[:, 0] <= Z)
+
+    # Overlaps along each axis with all the packed cases
+    x1, x2 = np.minimum(R, right), np.maximum(L, x)
+    y1, y2 = np.minimum(B, back), np.maximum(F, y)
+    overlapX, overlapY = x1 > x2, y1 > y2
+    overlapZ = np.minimum(T, top) > np.maximum(D, z)
+
+    # Intersections, supporting cases, and supporting cases that cannot hold anything
+    intersection = overlapX & overlapY & overlapZ
+    support = overlapX & overlapY & (T == z)
+    stop = intersection | (support & (canHold == 0))
+
+    # The obstructions: every direction of insert is lost the first time a case obstructs
+    # it, while the insert from above is reduced for each case above.
+    risk = ~((x[:, 0] == 0) | (right[:, 0] == X) | (y[:, 0] == 0) | (back[:, 0] == Y))
+    if risk.any():
+        alongX, alongY = overlapY & overlapZ & ~overlapX, overlapX & overlapZ & ~overlapY
+        lost = np.zeros(stop.shape, dtype=np.int8)
+        for direction in (alongX & (L < x), alongX & (L > x), alongY & (F < y), alongY & (F > y)):
+            lost += direction & (np.cumsum(direction, axis=1) == 1)
+        lost += overlapX & overlapY & ~overlapZ & (D > z)
+        stop |= (np.cumsum(lost, axis=1) >= 5) & risk[:, None]
+
+    # The index of the first case that makes the placement unfeasible
+    first = _first(stop)
+    support &= np.arange(n) < first[:, None]
+
+    # Stability: supported surface and supported corners
+    surface = (np.where(support, (x1 - x2) * (y1 - y2), 0)).sum(axis=1)
+    corners = np.zeros(len(pivots), dtype=np.int8)
+    for px, py in ((x, y), (x, back), (right, back), (right, y)):
+        corners += (support & (x2 <= px) & (px <= x1) & (y2 <= py) & (py <= y1)).any(axis=1)
+    stable = (z[:, 0] == 0) | (surface / (dims[:, 0] * dims[:, 1]) >= minSurface) | (corners >= minCorners)
+
+    return inside & (first == n) & stable
+
+
+
+def findPlacement (case, arrays, points, size, minSurface, minCorners):
+    """
+    This method looks for the first feasible position of a case in the same order used
+    by the packing.packer.dubePacker (i.e., extreme points, rotations), evaluating
+    all the candidates together.
+
+    :param case: <Case> The case to place.
+    :param arrays: <CaseArrays> The packed cases.
+    :param points: <ExtremePoints> The extreme points of the pallet.
+    :param size: <tuple> The size of the pallet.
+    :param minSurface: <float> The minimum supported surface for the stability.
+    :param minCorners: <int> The minimum supported corners for the stability.
+    :return: <tuple> None if the case cannot be placed, otherwise the position and
+            if the case must be rotated.
+    """
+    # The candidate pivots in the order in which they are tried
+    candidates = [pivot for _, _, pivot in points]
+    pivots = np.array(candidates, dtype=float).reshape(-1, 3)
+
+    # Each pivot is tried with the case as it is and rotated
+    dims = np.array(((case.sizex, case.sizey, case.sizez), (case.sizey, case.sizex, case.sizez)), dtype=float)
+    for start in range(0, len(pivots), CHUNK_SIZE):
+        chunk = pivots[start:start + CHUNK_SIZE]
+        feasible = _evaluate(np.repeat(chunk, 2, axis=0), np.tile(dims, (len(chunk), 1)),
+                             arrays, size, minSurface, minCorners)
+        if feasible.any():
+            k = feasible.argmax()
+            return candidates[start + k // 2], bool(k % 2)
+
+    return None
@@ -0,0 +1,208 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import time
+import numpy as np
+
+
+# The maximum number of orderlines of a layer whose order is optimised exactly.
+# The exact method visits all the subsets of the layer, so its time grows
+# exponentially with this number. Larger layers are optimised by local search.
+EXACT_MAX_ORDERLINES = 9
+
+# The maximum number of consecutive orderlines moved together by the Or-opt.
+OROPT_MAX_LENGTH = 3
+
+# The minimum reduction of cost considered an improvement by the local search.
+EPSILON = 1e-9
+
+
+
+def _heldKarp (states, group, d):
+    """
+    This method extends a set of partial paths by visiting all the nodes of a group
+    in the best possible order, using the dynamic programming of Held and Karp.
+
+    :param states: <dict<int, tuple>> For each last node of the partial paths, the
+                    cost and the nodes of the best partial path ending in it.
+    :param group: <list<int>> The nodes to visit.
+    :param d: <list<list<float>>> The matrix of distances between the nodes.
+    :return: <dict<int, tuple>> For each node of the group, the cost and the nodes
+            of the best partial path visiting all the group and ending in it.
+    """
+    L = len(group)
+    full = (1 << L) - 1
+    cost = [[float("inf")] * L for _ in range(full + 1)]
+    parent = [[None] * L for _ in range(full + 1)]
+
+    # The first node of the group is reached from the best partial path
+    for j, v in enumerate(group):
+        cost[1 << j][j], parent[1 << j][j] = min((c + d[u][v], u) for u, (c, _) in states.items())
+
+    # The other nodes are added one at a time
+    for mask in range(1, full + 1):
+        row = cost[mask]
+        for j in range(L):
+            if not mask & (1 << j):
+                continue
+            c, du = row[j], d[group[j]]
+            for k in range(L):
+                if mask & (1 << k):
+                    continue
+                nextMask = mask | (1 << k)
+                if (nc := c + du[group[k]]) < cost[nextMask][k]:
+                    cost[nextMask][k], parent[nextMask][k] = nc, j
+
+    # Rebuild the best path ending in each node of the group
+    result = {}
+    for j in range(L):
+        nodes, mask, k = [], full, j
+        while mask != 1 << k:
+            nodes.append(group[k])
+            mask, k = mask ^ (1 << k), parent[mask][k]
+        nodes.append(group[k])
+        result[group[j]] = (cost[full][j], states[parent[mask][k]][1] + tuple(reversed(nodes)))
+    return result
+
+
+
+def _twoOpt (s, d):
+    """
+    This method makes a pass of 2-opt on a sequence of nodes, reversing
+    each subsequence whose reversal reduces the cost. The first and the
+    last node of the sequence are never moved.
+
+    The cost of the reversed subsequence is updated incrementally, so the
+    distances do not need to be symmetric.
+
+    :param s: <list<int>> The sequence of nodes, updated in place.
+    :param d: <list<list<float>>> The matrix of distances between the nodes.
+    :return: <bool> True if the sequence has been improved.
+    """
+    improved, n = False, len(s)
+    for i in range(1, n - 2):
+        forward = backward = 0
+        for j in range(i + 1, n - 1):
+            forward += d[s[j - 1]][s[j]]
+            backward += d[s[j]][s[j - 1]]
+            delta = (d[s[i - 1]][s[j]] + d[s[i]][s[j + 1]] - d[s[i - 1]][s[i]] - d[s[j]][s[j + 1]]
+                     + backward - forward)
+            if delta < -EPSILON:
+                s[i:j + 1] = s[i:j + 1][::-1]
+                forward, backward = backward, forward
+                improved = True
+    return improved
+
+
+
+def _orOpt (s, d):
+    """
+    This method makes a pass of Or-opt on a sequence of nodes, moving each
+    subsequence of up to OROPT_MAX_LENGTH nodes in the position where it
+    reduces the cost the most. The first and the last node of the sequence
+    are never moved.
+
+    :param s: <list<int>> The sequence of nodes, updated in place.
+    :param d: <list<list<float>>> The matrix of distances between the nodes.
+    :return: <bool> True if the sequence has been improved.
+    """
+    improved, n = False, len(s)
+    for k in range(1, OROPT_MAX_LENGTH + 1):
+        for i in range(1, n - k):
+            first, last = s[i], s[i + k - 1]
+            removal = d[s[i - 1]][first] + d[last][s[i + k]] - d[s[i - 1]][s[i + k]]
+            bestDelta, bestPos = -EPSILON, None
+            for p in range(n - 1):
+                if i - 1 <= p < i + k:
+                    continue
+                u, v = s[p], s[p + 1]
+                if (delta := d[u][first] + d[last][v] - d[u][v] - removal) < bestDelta:
+                    bestDelta, bestPos = delta, p
+            if bestPos is not None:
+                segment = s[i:i + k]
+                del s[i:i + k]
+                pos = bestPos + 1 if bestPos < i else bestPos + 1 - k
+                s[pos:pos] = segment
+                improved = True
+    return improved
+
+
+
+def _localSearch (start, group, end, d, deadline=None):
+    """
+    This method improves the order in which the nodes of a group are visited
+    between two given nodes, alternating passes of 2-opt and Or-opt until no
+    improvement is found or the deadline is exceeded.
+
+    :param start: <int> The node visited before the group.
+    :param group: <list<int>> The nodes of the group in their starting order.
+    :param end: <int> The node visited after the group.
+    :param d: <list<list<float>>> The matrix of distances between the nodes.
+    :param deadline: <float> The time at which the search must stop (optional).
+    :return: <list<int>> The nodes of the group in the improved order.
+    """
+    s = [start, *group, end]
+    while deadline is None or time.time() < deadline:
+        improved = _twoOpt(s, d)
+        if deadline is not None and time.time() >= deadline:
+            break
+        if not (_orOpt(s, d) or improved):
+            break
+    return s[1:-1]
+
+
+
+def optimizePath (groups, dists, deadline=None):
+    """
+    This method returns the best order in which the storage locations of a pallet
+    can be visited, respecting the order in which the layers of the pallet are built.
+    All the orderlines of a layer must be picked before those of the next layer, but
+    the order within each layer is free.
+
+    The groups are visited one after the other. The small ones are optimised exactly,
+    together with the groups before them, by the dynamic programming of Held and Karp.
+    The large ones are optimised by 2-opt and Or-opt, starting from their current order,
+    until the deadline (if any). Since both the methods never accept a worse solution,
+    the path returned is never longer than the one that visits the groups in the
+    given order.
+
+    :param groups: <list<list<OrderLine>>> The orderlines of each layer, sorted by layer.
+    :param dists: <numpy.array> The matrix of distances between locations.
+    :param deadline: <float> The time at which the local search must stop (optional).
+    :return: <tuple<OrderLine>> The orderlines in the order in which they are fulfilled.
+    """
+    # Work on the distances between the depot (i.e., node 0) and the orderlines
+    lines = [line for group in groups for line in group]
+    locations = np.array([0, *(line.location for line in lines)], dtype=np.intp)
+    d = dists[np.ix_(locations, locations)].tolist()
+
+    nodes, first = [], 1
+    for group in groups:
+        nodes.append(list(range(first, first + len(group))))
+        first += len(group)
+
+    # For each last node of the best paths built so far, their cost and their nodes
+    states = {0: (0, ())}
+    for i, group in enumerate(nodes):
+        if len(group) <= EXACT_MAX_ORDERLINES:
+            states = _heldKarp(states, group, d)
+            continue
+        # Continue the path that reaches the group with the lowest cost
+        start = min(states, key=lambda u: states[u][0] + d[u][group[0]])
+        cost, path = states[start]
+        end = nodes[i + 1][0] if i + 1 < len(nodes) else 0
+        group = _localSearch(start, group, end, d, deadline)
+        cost += d[start][group[0]] + sum(d[u][v] for u, v in zip(group[:-1], group[1:]))
+        states = {group[-1]: (cost, path + tuple(group))}
+
+    last = min(states, key=lambda u: states[u][0] + d[u][0])
+    return tuple(lines[node - 1] for node in states[last][1])
@@ -0,0 +1,137 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import collections
+import numpy as np
+
+from packing.pallet import Pallet, HashableDict
+from packing.orderline import assignPallet
+
+
+# A compact and immutable record of a solution, made only of read-only NumPy arrays
+# of integers, which refer to the orderlines by their index. It does not share any
+# object with the solver, so it can be kept while the search goes on, and cheaply
+# sent from a process to another.
+#
+# :attr pallet: <numpy.array> For each orderline, the index of its pallet (-1 if none).
+# :attr layer: <numpy.array> For each orderline, its layer into the pallet (-1 if none).
+# :attr lines: <numpy.array> The orderlines of each pallet in the order in which they
+#               have been added, one pallet after the other.
+# :attr layerLines: <numpy.array> The orderlines of each pallet in the order of its
+#               layersMap, which breaks the ties between orderlines on the same layer.
+# :attr lineStarts: <numpy.array> Where the orderlines of each pallet start, plus the end.
+# :attr cases: <numpy.array> The packed cases of each pallet, in the order in which they
+#               have been packed, as rows of (orderline, x, y, z, sizex, sizey, rotated, canHold).
+# :attr caseStarts: <numpy.array> Where the cases of each pallet start, plus the end.
+# :attr edges: <numpy.array> The edges used to build the solution, in the order in which they
+#               have been used, as their indexes into the table of the edges, or the one's
+#               complement of the index (i.e., ~index) when the inverse edge has been used.
+# :attr cost: <float> The cost of the solution (if known).
+SolutionRecord = collections.namedtuple("SolutionRecord", ("pallet", "layer", "lines", "layerLines",
+                                                           "lineStarts", "cases", "caseStarts", "edges", "cost"))
+
+
+
+def _readonly (array):
+    array.flags.writeable = False
+    return array
+
+
+
+def encode (palletsList, index, cost=None, solutionEdges=(), edges=None):
+    """
+    This method returns the record of a solution (see SolutionRecord). It only
+    reads the pallets, in a single pass over their orderlines and cases.
+
+    :param palletsList: <list<Pallet>> The solution.
+    :param index: <dict<int, int>> For the id of each orderline, its index.
+    :param cost: <float> The cost of the solution (optional).
+    :param solutionEdges: <list<Edge>> The edges used to build the solution (optional).
+    :param edges: <EdgeTable> The table of the edges (needed only if solutionEdges are provided).
+    :return: <SolutionRecord> The record.
+    """
+    lines, layerLines, layers, cases = [], [], [], []
+    lineStarts, caseStarts = [0], [0]
+    for pallet in palletsList:
+        lines.extend(index[id(line)] for line in pallet.sorted_orderlines)
+        for line, layer in pallet.layersMap.items():
+            layerLines.append(index[id(line)])
+            layers.append(layer)
+        cases.extend(v for c in pallet.cases
+                     for v in (index[id(c.orderline)], c.x, c.y, c.z, c.sizex, c.sizey, c.rotated, c.canHold))
+        lineStarts.append(len(lines))
+        caseStarts.append(len(cases) // 8)
+
+    lines = np.array(lines, dtype=np.int32)
+    lineStarts = np.array(lineStarts, dtype=np.int32)
+    layerLines = np.array(layerLines, dtype=np.int32)
+    pallet = np.full(len(index), -1, dtype=np.int32)
+    pallet[lines] = np.repeat(np.arange(len(palletsList), dtype=np.int32), np.diff(lineStarts))
+    layer = np.full(len(index), -1, dtype=np.int32)
+    layer[layerLines] = layers
+    used = [i if edges[i] is edge else ~i for edge in solutionEdges for i in (edges.indexOf(edge),)]
+
+    return SolutionRecord(
+        _readonly(pallet), _readonly(layer), _readonly(lines), _readonly(layerLines), _readonly(lineStarts),
+        _readonly(np.array(cases, dtype=np.int64).reshape(-1, 8)), _readonly(np.array(caseStarts, dtype=np.int32)),
+        _readonly(np.array(used, dtype=np.int64)), cost,
+    )
+
+
+
+def decode (record, orderlines, pallet_size, pallet_max_weight, assign=True):
+    """
+    This method builds the pallets of a solution from its record (see SolutionRecord).
+    The cases of an orderline are considered interchangeable, since they all contain
+    the same product.
+
+    :param record: <SolutionRecord> The record.
+    :param orderlines: <tuple<OrderLine>> The orderlines the record refers to.
+    :param pallet_size: <tuple<int>> The size of the pallets.
+    :param pallet_max_weight: <int> The maximum weight of the pallets.
+    :param assign: <bool> If True, each orderline is assigned to its new pallet. It must
+                    be False while a search is working on the same orderlines.
+    :return: <list<Pallet>> The solution.
+    """
+    lines, layerLines, layer = record.lines.tolist(), record.layerLines.tolist(), record.layer.tolist()
+    lineStarts, caseStarts, cases = record.lineStarts.tolist(), record.caseStarts.tolist(), record.cases.tolist()
+
+    palletsList = []
+    for k in range(len(lineStarts) - 1):
+        p = Pallet(pallet_size, pallet_max_weight)
+        sorted_orderlines = [orderlines[i] for i in lines[lineStarts[k]:lineStarts[k + 1]]]
+        available = {id(line): iter(line.cases) for line in sorted_orderlines}
+        for i, x, y, z, sizex, sizey, rotated, canHold in cases[caseStarts[k]:caseStarts[k + 1]]:
+            c = next(available[id(orderlines[i])]).__copy__()
+            c.x, c.y, c.z, c.sizex, c.sizey, c.rotated, c.canHold = x, y, z, sizex, sizey, bool(rotated), canHold
+            p.cases.append(c)
+        p.layersMap = HashableDict((orderlines[i], layer[i]) for i in layerLines[lineStarts[k]:lineStarts[k + 1]])
+        p.sorted_orderlines = sorted_orderlines
+        p.orderlines = set(sorted_orderlines)
+        p.weight = sum(line.weight for line in sorted_orderlines)
+        p.volume = sum(line.volume for line in sorted_orderlines)
+        if assign:
+            [ assignPallet(line, p) for line in sorted_orderlines ]
+        palletsList.append(p)
+    return palletsList
+
+
+
+def decodeEdges (record, edges):
+    """
+    This method returns the edges used to build a solution (see SolutionRecord).
+
+    :param record: <SolutionRecord> The record.
+    :param edges: <EdgeTable> The table of the edges the record refers to.
+    :return: <deque<Edge>> The edges in the order in which they have been used.
+    """
+    return collections.deque(edges[i] if i >= 0 else edges[~i].inverse for i in record.edges.tolist())
@@ -18,15 +18,25 @@ import collections
 import operator
 import random
 import itertools
+import multiprocessing
+import numpy as np
 import matplotlib.pyplot as plt
 import time
 from math import log
 
-from packing import dubePacker
-from packing.pallet import Pallet
+from packing import DubeEngine
+from packing.cache import InfeasibleCache, DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES
+from packing.filters import reject, merge
+from packing.pallet import Pallet, HashableDict
 from packing.case import Case, resetCase
 from packing.orderline import assignPallet
+from packing.edge import EdgeTable
+from packing.registry import PalletRegistry
+from packing.bins import OpenPallets
 import utils
+import routing
+import solution
+from stopping import SearchState, AnyOf, TimeLimit, Deadline, Cancelled
 
 
 # Convention value used to obtain a greedy behaviour from the
@@ -37,6 +47,12 @@ import utils
 GREEDY_BETA = 0.9999
 
 
+# An improvement of the best solution found by the anytime search (see Solver.anytime):
+# the record of the solution (see Solver.encode), its cost, the time elapsed since the beginning of the search, and the
+# number of iterations made.
+Improvement = collections.namedtuple("Improvement", ("solution", "cost", "elapsed", "iterations"))
+
+
 def _bra (array, beta):
     """
     This method carry out a biased-randomised selection over a certain list.
@@ -46,16 +62,64 @@ def _bra (array, beta):
 
     and it therefore prioritise the first elements in list.
 
+    The options are kept in reverse order, so that the elements picked, which are
+    usually among the first ones, are removed from the end of the list, shifting
+    only the elements that precede them (i.e., about 1 / beta on average), instead
+    of all the remaining options.
+
     :param array: <list> The set of options already sorted from the best to the worst.
     :param beta: <float> The parameter of the quasi-geometric distribution.
     :return: The element picked at each iteration.
 
     """
-    arr = list(array)
-    L = len(array)
-    for _ in range(L):
-        idx = int(log(random.random(), 1.0 - beta)) % len(arr)
-        yield arr.pop(idx)
+    arr = list(reversed(array))
+    for L in range(len(arr), 0, -1):
+        idx = int(log(random.random(), 1.0 - beta)) % L
+        yield arr.pop(L - 1 - idx)
+
+
+
+# The solver shared with the processes of the parallel multi start, and the rule
+# that stops them. They are set before the processes are forked, so that they can
+# read the problem data without copying them (see Solver.multi_start).
+_shared = None
+
+
+
+def _multiStartWorker (args):
+    """
+    This method is executed by each process of the parallel multi start. It generates
+    solutions until the available time is over, using its own random stream.
+
+    :param args: <tuple> The seed of the random stream, the time at which the search
+                started, the available time, and the range of the parameter of the
+                biased randomisation.
+    :return: <tuple> The cost of the best solution found, its record (see
+            Solver.encode), the number of iterations, for each iteration the
+            time and the cost of the best solution found by the process so far,
+            and the reason of the stop.
+    """
+    seed, start, maxtime, betarange = args
+    solver, stopping = _shared
+    heuristic, solutionCost = solver.heuristic, solver.solutionCost
+    stop = AnyOf(TimeLimit(maxtime), *((stopping,) if stopping is not None else ()))
+    random.seed(seed)
+
+    bestCost, bestRecord, history = float("inf"), None, []
+    state = SearchState(bestCost, start)
+    state.now = time.time()
+    while (reason := stop.check(state)) is None:
+        beta = random.uniform(*betarange)
+        newSol, newEdges = heuristic(beta)
+        newCost = solutionCost(newSol)
+        state.iterations += 1
+        if newCost < bestCost:
+            bestCost, bestRecord = newCost, solver.encode(newSol, newCost, newEdges)
+            state.improve(bestCost)
+        history.append((state.now, bestCost))
+        state.now = time.time()
+
+    return bestCost, bestRecord, len(history), history, reason
 
 
 
@@ -64,26 +128,73 @@ class Solver (object):
     An instance of this class represents a solver for the
     3-dimensional Case Picking problem.
     """
-    def __init__(self, orderlines, edges, dists, pallet_size=(120,80,150), pallet_max_weight=450):
+    def __init__(self, orderlines, edges, dists, pallet_size=(120,80,150), pallet_max_weight=450, cache_maxbytes=DEFAULT_MAX_BYTES, vectorized=False, blocks=False, packer=None, infeasible_maxentries=DEFAULT_MAX_ENTRIES):
         """
         :attr orderlines: <tuple<OrderLine>> The set of orderlines for which
                         the problem must be solved.
-        :attr edges: <tuple<Edge>> The edges connecting location to each other.
+        :attr edges: <EdgeTable> The edges connecting location to each other (if a
+                        sequence of Edge objects is provided, it is turned into a table).
         :attr dists: <numpy.array> The matrix of distances between locations.
         :attr pallet_size: <tuple<int>> Pallets size
         :attr pallet_max_weight: <int> Pallets max weight
+        :param cache_maxbytes: <int> The memory (in bytes) used to cache the results of
+                        the packer (if 0 or None, the results are not cached).
+        :param vectorized: <bool> True to use the vectorized mode of the packer.
+        :param blocks: <bool> True to use the block mode of the packer, which places
+                        the identical cases of an orderline as blocks.
+        :attr packer: <PackerEngine> The engine used to pack the pallets. If not provided,
+                        a DubeEngine is built using the three parameters above.
         :attr history: The evelution of the best solution during the iterations
                         of the algorithm.
+        :attr cache: <PackingCache> The cache of the packings made by the packer (if any).
+        :param infeasible_maxentries: <int> The maximum number of infeasible mergings
+                        remembered by the solver (if 0 or None, they are not remembered).
+        :attr infeasible: <InfeasibleCache> The mergings of pallets proven infeasible.
+        :attr rejections: <Counter> For each filter, the number of mergings it rejected
+                        without calling the packer (see packing.filters).
+        :attr savings_order: <numpy.array> The indexes of the edges sorted for decreasing saving.
+        :attr line_index: <dict<int, int>> For the id of each orderline, its index into the
+                        table of the edges, used to refer to the orderlines in the records
+                        of the solutions.
+        :attr seed: <tuple> The solution (i.e., the pallets and the edges used) the next
+                        search starts from, if any (see warm_start).
+        :attr best: <SolutionRecord> The best solution found by the last search (see anytime).
+        :attr stop_reason: <str> The reason why the last search stopped (see stopping), or
+                        None if it was interrupted by the caller.
 
         NOTE that to each OrderLine is supposed to be associated one and only
         one location.
         """
         self.orderlines = orderlines
-        self.edges = edges
+        self.edges = edges if isinstance(edges, EdgeTable) else EdgeTable.fromEdges(orderlines, edges)
         self.dists = dists
         self.pallet_size = pallet_size
         self.pallet_max_weight = pallet_max_weight
         self.history = collections.deque()
+        self.packer = packer if packer is not None else DubeEngine(cache_maxbytes, vectorized, blocks)
+        self.cache = self.packer.cache
+        self.infeasible = InfeasibleCache(infeasible_maxentries) if infeasible_maxentries else None
+        self.rejections = collections.Counter()
+        self.line_index = {id(line): i for i, line in enumerate(self.edges.orderlines)}
+        self.savings_order = self._savings_order()
+        self.seed = None
+        self.best = None
+        self.stop_reason = None
+
+
+    def _savings_order (self):
+        """
+        This method returns the indexes of the edges sorted for decreasing saving,
+        excluding the edges of the orderlines no longer in the problem (see update).
+        """
+        edges = self.edges
+        # NOTE: The stable sort keeps the edges with the same saving in their order.
+        order = np.argsort(-edges.saving, kind="stable")
+        if len(self.orderlines) < len(edges.orderlines):
+            alive = np.zeros(len(edges.orderlines), dtype=bool)
+            alive[[self.line_index[id(line)] for line in self.orderlines]] = True
+            order = order[alive[edges.origin[order]] & alive[edges.end[order]]]
+        return order
 
 
     def plot (self):
@@ -109,7 +220,8 @@ class Solver (object):
         """
         # Get pallets characteristics on stack
         pallet_size, pallet_max_weight = self.pallet_size, self.pallet_max_weight
-
+        pack = self.packer.pack
+        infeasible = self.infeasible
 
         for _ in range(n):
             # Get the next edge to remove from the solution
@@ -137,25 +249,43 @@ class Solver (object):
                 continue
 
             cases_1 = tuple(resetCase(i) for or_line in sorted_orderlines_1 for i in or_line.cases)
-            cases_2 = tuple(resetCase(i) for or_line in sorted_orderlines_2 for i in or_line.cases)
-            done1, packedCases1, layersMap1 = dubePacker(newPallet1, cases_1)
-            done2, packedCases2, layersMap2 = dubePacker(newPallet2, cases_2)
+            done1 = pack(newPallet1, cases_1)
+            if not done1:
+                continue
+
+            # The first part of the pallet is recovered as it was packed after the last
+            # merging that did not exceed it, and only its remaining orderlines are packed.
+            # If they do not fit, the whole part is packed from scratch.
+            newPallet2 = self._prefix(pallet, _idx)
+            lines = len(newPallet2.sorted_orderlines)
+            cases_2 = tuple(resetCase(i) for or_line in sorted_orderlines_2[lines:] for i in or_line.cases)
+            done2 = lines == _idx or pack(newPallet2, cases_2)
+            if not done2 and lines > 0:
+                newPallet2, lines = Pallet(pallet_size, pallet_max_weight), 0
+                cases_2 = tuple(resetCase(i) for or_line in sorted_orderlines_2 for i in or_line.cases)
+                done2 = pack(newPallet2, cases_2)
+            if done2 and lines < _idx:
+                newPallet2.sorted_orderlines = sorted_orderlines_2
+                newPallet2.orderlines = set(sorted_orderlines_2)
+                newPallet2.weight = sum(i.weight for i in newPallet2.cases)
+                newPallet2.volume = sum(i.volume for i in newPallet2.cases)
+                # The packing over a recovered prefix differs from the one of the same
+                # orderlines packed from scratch, hence it has a different signature.
+                if infeasible is not None:
+                    newPallet2.signature = infeasible.leaf(sorted_orderlines_2) if lines == 0 else \
+                        infeasible.appended(newPallet2.signature, sorted_orderlines_2[lines:])
+                newPallet2.snapshot()
 
             # Eventually generates the new pallets
             if done1 and done2:
                 # Update pallets characteristics
                 newPallet1.sorted_orderlines = sorted_orderlines_1
-                newPallet2.sorted_orderlines = sorted_orderlines_2
                 newPallet1.orderlines = set(sorted_orderlines_1)
-                newPallet2.orderlines = set(sorted_orderlines_2)
-                newPallet1.cases = packedCases1
-                newPallet2.cases = packedCases2
-                newPallet1.layersMap = layersMap1
-                newPallet2.layersMap = layersMap2
                 newPallet1.weight = sum(i.weight for i in cases_1)
-                newPallet2.weight = sum(i.weight for i in cases_2)
                 newPallet1.volume = sum(i.volume for i in cases_1)
-                newPallet2.volume = sum(i.volume for i in cases_2)
+                if infeasible is not None:
+                    newPallet1.signature = infeasible.leaf(sorted_orderlines_1)
+                newPallet1.snapshot()
                 [ assignPallet(orderline, newPallet1) for orderline in sorted_orderlines_1 ]
                 [ assignPallet(orderline, newPallet2) for orderline in sorted_orderlines_2 ]
 
@@ -167,6 +297,62 @@ class Solver (object):
 
 
 
+    def _prefix (self, pallet, n):
+        """
+        This method rebuilds the pallet made of the first orderlines of another one,
+        as it was packed after the last merging that did not exceed the first n
+        (see Pallet.snapshots).
+        Since the packer only appends cases to a pallet, and the placement of each case
+        only depends on the cases placed before, the packing is made of the first cases
+        of the pallet, and no packing is needed.
+
+        :param pallet: <Pallet> The pallet.
+        :param n: <int> The maximum number of orderlines to keep.
+        :return: <Pallet> The new pallet, which is empty if no snapshot is suitable.
+        """
+        p = Pallet(self.pallet_size, self.pallet_max_weight)
+        snapshots = [s for s in pallet.snapshots if s[0] <= n]
+        if not snapshots:
+            return p
+        lines, cases, signature, shelf = snapshots[-1]
+        p.cases.extend(c.__copy__() for c in itertools.islice(pallet.cases, cases))
+        p.sorted_orderlines = pallet.sorted_orderlines[:lines]
+        p.orderlines = set(p.sorted_orderlines)
+        p.layersMap = HashableDict((line, layer) for line, layer in pallet.layersMap.items() if line in p.orderlines)
+        p.weight = sum(c.weight for c in p.cases)
+        p.volume = sum(c.volume for c in p.cases)
+        p.signature = signature
+        p.shelf = shelf
+        p.snapshots = snapshots
+        return p
+
+
+    def _merge (self, host, hosted):
+        """
+        This method tries to pack the cases of a pallet into another one, unless
+        the merging is already known to be infeasible, and remembers the mergings
+        that fail, so that they are not tried again.
+
+        :param host: <Pallet> The pallet that should receive the cases.
+        :param hosted: <Pallet> The pallet whose cases should be moved.
+        :return: <bool> True if the merging has been successful and False otherwise.
+        """
+        infeasible = self.infeasible
+        if infeasible is None:
+            return self.packer.pack(host, hosted)
+
+        if infeasible.get(host.signature, hosted.signature):
+            self.rejections["infeasible"] += 1
+            return False
+
+        if self.packer.pack(host, hosted):
+            host.signature = infeasible.merged(host.signature, hosted.signature)
+            return True
+        infeasible.put(host.signature, hosted.signature)
+        return False
+
+
+
     def heuristic (self, beta, palletsList=None, solutionEdges=None):
         """
         This method provides a single solution to the problem.
@@ -182,85 +368,157 @@ class Solver (object):
 
         :return: The resulting list of pallets.
         """
-        # Get pallets characteristics on stack
-        pallet_size, pallet_max_weight = self.pallet_size, self.pallet_max_weight
+        # Get useful data on stack
+        rejections = self.rejections
+        tryMerge = self._merge
 
         # Build a dummy solution
         if not palletsList:
             palletsList = []
             for orderline in self.orderlines:
-                p = Pallet(pallet_size, pallet_max_weight)
-                done, packedCases, layersMap = dubePacker(p, orderline)
-                assert done == True
-                p.cases, p.layersMap = packedCases, layersMap
-                p.weight = orderline.weight
-                p.volume = orderline.volume
+                p = self._single(orderline)
                 orderline.pallet = p
-                p.orderlines.add(orderline)
-                p.sorted_orderlines.append(orderline)
                 palletsList.append(p)
 
         # Save the edges in the order in which they have been considered
         solutionEdges = solutionEdges if solutionEdges else collections.deque()
 
-        # Generate the savings list
-        savingsList = sorted(
-            [e for e in self.edges if e not in solutionEdges and e.inverse not in solutionEdges], 
-            key=operator.attrgetter("saving"), 
-            reverse=True
-        )
+        # Generate the savings list (i.e., the indexes of the edges), excluding
+        # the edges already used
+        edges = self.edges
+        used = np.zeros(len(edges), dtype=bool)
+        used[[edges.indexOf(e) for e in solutionEdges]] = True
+        order = self.savings_order
+        savingsList = order[~used[order]].tolist()
+        origins, ends = edges.origins, edges.ends
+
+        # The registry of the pallets (i.e., the pallet of each orderline)
+        registry = PalletRegistry(edges.orderlines, palletsList)
+        find, union, pallet = registry.find, registry.union, registry.pallet
 
         # Merging process
-        for edge in _bra(savingsList, beta):
+        for i in _bra(savingsList, beta):
             # Picks an edge and read the pallet it could connect
-            host = edge.origin.pallet
-            hosted = edge.end.pallet
+            # NOTE: The Edge object is only needed if the edge is used.
+            hostRoot, hostedRoot = find(origins[i]), find(ends[i])
 
             # The the hosting pallet and the hosted pallet are the same the procedure
             # interrupts and goes to the next edge
-            if host == hosted:
-                continue
-            # Control the volumetric lower bound
-            if host.volume + hosted.volume > host.maxVolume:
+            if hostRoot == hostedRoot:
                 continue
-            # Control the weight lower bound
-            if host.weight + hosted.weight > host.maxWeight:
+            host, hosted = pallet(hostRoot), pallet(hostedRoot)
+            # Control the necessary conditions (e.g., volumetric and weight lower bounds)
+            if (reason := reject(host, hosted)) is not None:
+                rejections[reason] += 1
                 continue
             # Try merging
-            done, packedCases, layersMap = dubePacker(host, hosted)
+            done = tryMerge(host, hosted)
             if done:
-                host.cases = packedCases
-                host.layersMap = layersMap
+                merge(host, hosted)
                 host.weight += hosted.weight
                 host.volume += hosted.volume
                 host.orderlines.update(hosted.orderlines)
                 host.sorted_orderlines.extend(hosted.orderlines)
-                palletsList.remove(hosted)
-                for line in hosted.orderlines:
-                    line.pallet = host
-                solutionEdges.append(edge)
+                host.snapshot()
+                union(hostRoot, hostedRoot)
+                solutionEdges.append(edges[i])
                 continue
             # Eventually try a merging using the inverse of the edge -- i.e., switching
             # the hositng pallet with the hosted pallet.
-            host, hosted, edge = hosted, host, edge.inverse
+            host, hosted, edge = hosted, host, edges[i].inverse
+            hostRoot, hostedRoot = hostedRoot, hostRoot
 
-            done, packedCases, layersMap = dubePacker(host, hosted)
+            done = tryMerge(host, hosted)
             if done:
-                host.cases = packedCases
-                host.layersMap = layersMap
+                merge(host, hosted)
                 host.weight += hosted.weight
                 host.volume += hosted.volume
                 host.orderlines.update(hosted.orderlines)
                 host.sorted_orderlines.extend(hosted.orderlines)
-                palletsList.remove(hosted)
-                for line in hosted.orderlines:
-                    line.pallet = host
+                host.snapshot()
+                union(hostRoot, hostedRoot)
                 solutionEdges.append(edge)
 
+        # Assign the orderlines to their pallets and remove the merged pallets
+        registry.assign()
+        palletsList[:] = registry.palletsList()
+
         # At the end, return the palletsList
         return palletsList, solutionEdges
 
 
+    def verify (self, palletsList, packer=None):
+        """
+        This method packs again all the pallets of a solution using another packer,
+        by default the DubeEngine. It can be used, for instance, to build the solutions
+        with a faster packer, and to verify only the final one with the exact packer.
+
+        The orderlines of each pallet are packed all together, in the order in which
+        they have been packed the first time. If this is not possible, the orderlines
+        are packed one at a time, and a new pallet is started when one does not fit.
+
+        :param palletsList: The solution to verify.
+        :param packer: <PackerEngine> The packer to use (a new DubeEngine if not provided).
+        :return: <tuple> The verified list of pallets, and the number of pallets of the
+                solution that have been split.
+        """
+        pallet_size, pallet_max_weight = self.pallet_size, self.pallet_max_weight
+        pack = (packer if packer is not None else DubeEngine()).pack
+
+        verified, split = [], 0
+        for pallet in palletsList:
+            # The orderlines in the order in which they have been packed
+            orderlines = tuple(dict.fromkeys(c.orderline for c in pallet.cases))
+            newPallets = [(Pallet(pallet_size, pallet_max_weight), orderlines)]
+            if not pack(newPallets[0][0], tuple(c for line in orderlines for c in line.cases)):
+                split += 1
+                newPallets = []
+                for line in orderlines:
+                    if not newPallets or not pack(newPallets[-1][0], line):
+                        newPallets.append((Pallet(pallet_size, pallet_max_weight), []))
+                        if not pack(newPallets[-1][0], line):
+                            raise ValueError(f"The cases of the orderline {line.code} cannot be packed in a pallet.")
+                    newPallets[-1][1].append(line)
+
+            # Update pallets characteristics
+            for p, lines in newPallets:
+                p.sorted_orderlines = list(lines)
+                p.orderlines = set(lines)
+                p.weight = sum(line.weight for line in lines)
+                p.volume = sum(line.volume for line in lines)
+                [ assignPallet(line, p) for line in lines ]
+                verified.append(p)
+
+        return verified, split
+
+
+    @staticmethod
+    def pathsCost(paths, dists):
+        """
+        Given many paths as sequences of storage locations and the matrix of distances, this
+        method calculates the cost of each path -- i.e., the distance walked by the picker
+        to visit the locations starting from and returning to the depot.
+
+        All the paths are concatenated into a single tour that passes through the depot
+        between them, so that the distances of all the legs are gathered from the matrix
+        at once, and then summed path by path.
+
+        :param paths: <iterable<sequence<int>>> The locations visited by each path, depot excluded.
+        :param dists: <numpy.array> The matrix of distances between locations.
+        :return: <numpy.array> The cost of each path.
+        """
+        tour, starts = [0], []
+        for locations in paths:
+            starts.append(len(tour) - 1)
+            tour.extend(locations)
+            tour.append(0)
+        tour = np.array(tour, dtype=np.intp)
+        legs = dists[tour[:-1], tour[1:]]
+        if not starts:
+            return legs
+        return np.add.reduceat(legs, starts)
+
+
     @staticmethod
     def getCost(paths, dists):
         """
@@ -272,17 +530,44 @@ class Solver (object):
         :param dists: The matrix of distances between locations
         :return: The distance walked by the picker to construct all pallets.
         """
-        total = 0
-        for path in paths.values():
-            total += dists[0, path[0].location] + dists[path[-1].location, 0]
-            total += sum(dists[i.location, j.location] for i, j in zip(path[:-1], path[1:]))
-        return total
+        return Solver.pathsCost(([i.location for i in path] for path in paths.values()), dists).sum()
 
 
     @staticmethod
     def singlePathCost(path, dists):
         """ Like getCost but executable om a single path """
-        return dists[0, path[0].location] + dists[path[-1].location, 0] + sum(dists[i.location, j.location] for i, j in zip(path[:-1], path[1:]))
+        locations = np.array([0, *(i.location for i in path), 0], dtype=np.intp)
+        return dists[locations[:-1], locations[1:]].sum()
+
+
+    @staticmethod
+    def _locations (pallet):
+        """
+        This method returns the storage locations visited to build a pallet, in the
+        order of its lazy path (see lazy_paths).
+        """
+        return [line.location for line, _ in sorted(pallet.layersMap.items(), key=operator.itemgetter(1))]
+
+
+    def solutionCost (self, palletsList):
+        """
+        This method returns the cost of a solution as the sum of the costs of its pallets.
+        It is equivalent to getCost(lazy_paths(palletsList)).
+
+        The cost of each pallet is cached into the pallet (see Pallet.routeCost), and the
+        packers reset it every time the content changes. Therefore, only the paths of the
+        pallets created or changed since the last evaluation are walked again, all of them
+        in a single call of pathsCost.
+
+        :param palletsList: <list<Pallet>> The solution.
+        :return: <float> The distance walked by the picker to construct all pallets.
+        """
+        changed = [pallet for pallet in palletsList if pallet.routeCost is None]
+        if changed:
+            locations = self._locations
+            for pallet, cost in zip(changed, self.pathsCost(map(locations, changed), self.dists)):
+                pallet.routeCost = cost
+        return sum(pallet.routeCost for pallet in palletsList)
 
 
     @staticmethod
@@ -302,91 +587,266 @@ class Solver (object):
 
     
     @staticmethod 
-    def opt2_paths(solution, dists):
+    def opt2_paths(solution, dists, maxtime=None):
         """
-        This method define the order in which locations must be visited 
-        testing many different options through permutation.
+        This method define the order in which locations must be visited
+        optimising the path of each pallet (see routing.optimizePath).
         The order in which items must be placed on the pallet is also respected.
+
+        :param solution: The solution (a set of pallets).
+        :param dists: The matrix of distances between locations.
+        :param maxtime: <float> The time available for the local search on the layers
+                        too large to be optimised exactly (optional).
+        :return: The dictionary of paths.
         """
+        deadline = None if maxtime is None else time.time() + maxtime
         paths_dict = dict()
 
         for pallet in solution:
 
             orderlines_levels = sorted(pallet.layersMap.items(), key=operator.itemgetter(1))
             groups = [[i[0] for i in group] for level, group in itertools.groupby(orderlines_levels, key=operator.itemgetter(1))]
-            
-            currentPath = None
-            currentCost = float("inf") 
 
-            for counter, orderlines in enumerate(groups):
-                L = len(orderlines)
-                
-                for permutated_orderlines in itertools.permutations(orderlines, L):
+            paths_dict[pallet] = routing.optimizePath(groups, dists, deadline)
+
+        return paths_dict
 
-                    newPath = tuple(itertools.chain.from_iterable( groups[k] if k != counter else permutated_orderlines for k in range(len(groups)) ))
-                    newCost = Solver.singlePathCost(newPath, dists)
 
-                    if newCost < currentCost:
-                        currentPath, currentCost = newPath, newCost
-                
 
-            paths_dict[pallet] = tuple(currentPath)
 
-        return paths_dict
+    def encode (self, palletsList, cost=None, solutionEdges=()):
+        """
+        This method returns the compact and immutable record of a solution, which
+        can be kept while the search goes on, or sent from a process to another
+        (see solution.SolutionRecord).
+
+        :param palletsList: <list<Pallet>> The solution.
+        :param cost: <float> The cost of the solution (optional).
+        :param solutionEdges: <list<Edge>> The edges used to build the solution (optional).
+        :return: <SolutionRecord> The record.
+        """
+        return solution.encode(palletsList, self.line_index, cost, solutionEdges, self.edges)
+
+
+    def decode (self, record, assign=True):
+        """
+        This method builds the pallets of a solution from its record (see Solver.encode).
+
+        :param record: <SolutionRecord> The record.
+        :param assign: <bool> If True, each orderline is assigned to its new pallet. It must
+                        be False while a search of this solver is in progress.
+        :return: <list<Pallet>> The solution.
+        """
+        return solution.decode(record, self.edges.orderlines, self.pallet_size, self.pallet_max_weight, assign)
+
+
+    def warm_start (self, palletsList, solutionEdges=()):
+        """
+        This method sets the solution the next search starts from, instead of the
+        solution made of one pallet for each orderline. The starting solution is
+        completed by the greedy heuristic, and then improved as usual.
+
+        :param palletsList: <list<Pallet> | SolutionRecord> The solution, or its record
+                            (whose edges are used in that case).
+        :param solutionEdges: <list<Edge>> The edges used to build the solution. If they
+                            are provided, the destruction process can undo the mergings
+                            of the starting solution as well.
+        """
+        if isinstance(palletsList, solution.SolutionRecord):
+            palletsList, solutionEdges = self.decode(palletsList), solution.decodeEdges(palletsList, self.edges)
+        self._adopt(palletsList)
+        self.seed = (list(palletsList), collections.deque(solutionEdges))
+
+
+    def _adopt (self, palletsList):
+        """
+        This method assigns the orderlines to the pallets of a solution, and gives a
+        new signature (see packing.cache.InfeasibleCache) to the pallets without one,
+        so that the infeasible mergings with them are remembered as well.
+        """
+        infeasible = self.infeasible
+        for pallet in palletsList:
+            [ assignPallet(line, pallet) for line in pallet.sorted_orderlines ]
+            if infeasible is not None and pallet.signature is None:
+                pallet.signature = infeasible.unique()
+
+
+    def _build (self, lines):
+        """
+        This method builds a new pallet with the cases of some orderlines.
+
+        :param lines: <list<OrderLine>> The orderlines in the order in which they are added.
+        :return: <Pallet> The pallet, or None if the cases cannot be packed together.
+        """
+        p = Pallet(self.pallet_size, self.pallet_max_weight)
+        cases = tuple(resetCase(i) for line in lines for i in line.cases)
+        if not self.packer.pack(p, cases):
+            return None
+        p.sorted_orderlines = list(lines)
+        p.orderlines = set(lines)
+        p.weight = sum(i.weight for i in cases)
+        p.volume = sum(i.volume for i in cases)
+        if self.infeasible is not None:
+            p.signature = self.infeasible.leaf(tuple(lines))
+        p.snapshot()
+        return p
+
+
+    def _single (self, line):
+        """
+        This method builds a new pallet with the cases of a single orderline.
 
-        
+        :param line: <OrderLine> The orderline.
+        :return: <Pallet> The pallet.
+        :raise ValueError: If the cases of the orderline cannot be packed together.
+        """
+        if (p := self._build((line,))) is None:
+            raise ValueError(f"The cases of the orderline {line.code} cannot be packed in a pallet.")
+        return p
+
+
+    def update (self, added=(), removed=(), k=None, nearest=False):
+        """
+        This method updates the problem when orderlines are added or removed, for
+        instance while a wave is being planned, without building a new solver.
+
+        The edges of the new orderlines are added to the table of the edges, and the
+        ones of the removed orderlines are removed from it, hence the records of the
+        solutions made before cannot be decoded any more. The caches of the packings
+        and of the infeasible mergings are kept.
+
+        If a solution is available (i.e., the starting solution set by warm_start, or the
+        best solution found by the last search), it is updated, and the next search starts
+        from it. Only the pallets that contained a removed orderline are packed again, and,
+        if their remaining cases cannot be packed together, they are split into one pallet
+        for each orderline. The new orderlines are added as one pallet each. The edges of
+        the solution are kept only if they still connect two orderlines of the same pallet.
+
+        :param added: <list<OrderLine>> The new orderlines.
+        :param removed: <list<OrderLine>> The orderlines removed from the problem.
+        :param k: <int> The number of partners of each new orderline, if the edges are
+                    sparse (see utils.get_edges).
+        :param nearest: <bool> In the sparse mode, True to select the nearest partners
+                    instead of the ones with the highest saving.
+        :raise ValueError: If a new orderline cannot be packed in a pallet alone. In this
+                    case, the problem is not updated.
+        """
+        removed = {id(line) for line in removed}
+
+        # The solution to update
+        if self.seed is not None:
+            palletsList, solutionEdges = self.seed
+        elif self.best is not None:
+            palletsList, solutionEdges = self.decode(self.best), solution.decodeEdges(self.best, self.edges)
+        else:
+            palletsList = solutionEdges = None
+
+        # The new orderlines are packed before changing anything
+        addedPallets = [self._single(line) for line in added] if palletsList is not None else []
+
+        # Update the orderlines and the edges, removing the ones of the orderlines
+        # no longer in the problem (including the ones removed by previous updates)
+        self.orderlines = tuple(line for line in self.orderlines if id(line) not in removed) + tuple(added)
+        edges, alive = self.edges, {id(line) for line in self.orderlines}
+        dead = np.fromiter((id(line) not in alive for line in edges.orderlines), dtype=bool, count=len(edges.orderlines))
+        if dead.any():
+            edges.prune(~(dead[edges.origin] | dead[edges.end]))
+        if added:
+            utils.extend_edges(edges, added, self.dists, k, nearest, [l for l, d in zip(edges.orderlines, dead) if d])
+            self.line_index = {id(line): i for i, line in enumerate(edges.orderlines)}
+        self.savings_order = self._savings_order()
+        self.best = None
+
+        if palletsList is None:
+            return
+
+        # Pack again the pallets that contained removed orderlines
+        build, newPallets = self._build, []
+        for pallet in palletsList:
+            if not any(id(line) in removed for line in pallet.sorted_orderlines):
+                newPallets.append(pallet)
+                continue
+            lines = [line for line in pallet.sorted_orderlines if id(line) not in removed]
+            if lines and (p := build(lines)) is not None:
+                newPallets.append(p)
+            else:
+                newPallets.extend(self._single(line) for line in lines)
+
+        # Add the new orderlines
+        newPallets.extend(addedPallets)
+
+        # Keep the edges inside the pallets
+        self._adopt(newPallets)
+        solutionEdges = [e for e in solutionEdges
+                         if id(e.origin) not in removed and id(e.end) not in removed and e.origin.pallet is e.end.pallet]
 
+        self.seed = (newPallets, collections.deque(solutionEdges))
 
 
-    def multi_start(self, maxtime, betarange=(0.1, 0.3)):
+    def multi_start(self, maxtime, betarange=(0.1, 0.3), workers=1, stopping=None):
         """
          This method executes many times the heuristic method generating many
          different solutions until the available time (i.e., maxtime) is not exceeded.
          Every time a new solution is generated, it is compared with the best found so
          far, and, if better, the best solution is temporarily updated.
 
+         If more than one worker is required, the solutions are generated in parallel
+         by as many processes. The processes are forked after the generation of the
+         starting solution, so that they share the problem data (and the caches built
+         so far) without copying them, and each of them uses its own random stream,
+         seeded by the random stream of the parent. At the end, each process returns
+         its best solution and the evolution of its best cost, which are merged by the
+         parent. Forking processes is only possible on POSIX systems.
+
+         Besides the available time, the search can be stopped by other rules (see
+         stopping), and the reason of the stop is saved in stop_reason. When processes
+         are used, each of them applies the rules to its own search, and the reason
+         reported is the one of the process that found the best solution.
+
          :param maxtime: <time>/<float> The available computational time.
          :param betarange: The range of the parameter of the biased randomisation.
+         :param workers: <int> The number of processes generating solutions.
+         :param stopping: <StoppingRule> Other rules that stop the search (optional).
 
          :return: <tuple> It returns (i) the best solution found (a set of pallets),
                     (ii) the cost of the best solution (the distance made by the picker),
                     (iii) the number of solutions explored by the algorithm in the
                     available computational time.
         """
-        # Move useful data to the stack
-        heuristic = self.heuristic
-        getCost = self.getCost
-        dists = self.dists
-        orderlines = self.orderlines
-        save = self.history.append
-        lazy_paths = self.lazy_paths   
-
-        # Generate a starting solution and set the starting best solution
-        bestSol, bestSolEdges = heuristic(GREEDY_BETA)
-        bestCost = getCost( lazy_paths(bestSol) , dists)
-
-        # Start a multistart iterated local search
-        iterations = 0
-        start = time.time()
-
-        while time.time() - start < maxtime:
-            iterations += 1
-
-            beta = random.uniform(*betarange)
-            newSol, _ = heuristic(beta)
-            newCost = getCost( lazy_paths(newSol), dists)
-
-            # Eventually update the best and the current
+        if workers > 1:
+            # Generate a starting solution and set the starting best solution
+            bestSol, bestSolEdges = self._greedy()
+            bestCost = self.solutionCost(bestSol)
+            self.best = self.encode(bestSol, bestCost, bestSolEdges)
+            save = self.history.append
+            start = time.time()
+
+            global _shared
+            seeds = [random.getrandbits(64) for _ in range(workers)]
+            _shared = (self, stopping)
+            try:
+                with multiprocessing.get_context("fork").Pool(workers) as pool:
+                    results = pool.map(_multiStartWorker, [(seed, start, maxtime, betarange) for seed in seeds])
+            finally:
+                _shared = None
+
+            # Keep the best solution found
+            newCost, record, _, _, self.stop_reason = min(results, key=operator.itemgetter(0))
             if newCost < bestCost:
-                bestSol, bestCost = newSol, newCost
+                bestSol, self.best = self.decode(record), record
 
-            # Save the current best
-            save(bestCost)
+            # Merge the evolutions of the best solutions of the processes
+            for _, cost in sorted(itertools.chain.from_iterable(r[3] for r in results)):
+                bestCost = min(bestCost, cost)
+                save(bestCost)
 
-        return bestSol, bestCost, iterations
+            return bestSol, bestCost, sum(r[2] for r in results)
 
+        best, iterations = self._exhaust(self.anytime(maxtime, betarange, restart=True, stopping=stopping))
+        return self.decode(best.solution), best.cost, iterations
 
-    def __call__ (self, maxtime, betarange=(0.1, 0.3), mingamma=1, gammastep=1):
+
+    def __call__ (self, maxtime, betarange=(0.1, 0.3), mingamma=1, gammastep=1, stopping=None):
         """
          This method executes many times the heuristic method generating many
          different solutions until the available time (i.e., maxtime) is not exceeded.
@@ -398,46 +858,102 @@ class Solver (object):
          by reversing the mrging of <gamma> edges, and reconstructed using 
          the biased randomisation.
 
+         Besides the available time, the search can be stopped by other rules (see
+         stopping), and the reason of the stop is saved in stop_reason.
+
          :param maxtime: <time>/<float> The available computational time.
          :param betarange: The range of the parameter of the biased randomisation.
          :param mingamma: The minimum entity of the destruction process.
          :param gammastep: The increase of gamma every time a best solution is not found.
+         :param stopping: <StoppingRule> Other rules that stop the search (optional).
 
          :return: <tuple> It returns (i) the best solution found (a set of pallets),
                     (ii) the cost of the best solution (the distance made by the picker),
                     (iii) the number of solutions explored by the algorithm in the
                     available computational time.
         """
+        best, iterations = self._exhaust(self.anytime(maxtime, betarange, mingamma, gammastep, stopping=stopping))
+        return self.decode(best.solution), best.cost, iterations
+
+
+    def anytime (self, maxtime=None, betarange=(0.1, 0.3), mingamma=1, gammastep=1, deadline=None, cancel=None, restart=False, stopping=None):
+        """
+         This method is the anytime version of the iterated local search (see __call__).
+         It is a generator that yields each improvement of the best solution as soon as
+         it is found, so that a usable solution is available within any latency budget,
+         and better ones keep arriving afterwards.
+
+         The greedy solution (see GREEDY_BETA), which completes the starting solution set
+         by warm_start (if any), is yielded right away, before any check of the available
+         time, so a solution is always available. Then, the search goes on
+         until the available time is exceeded, the deadline is reached, the cancel token
+         is set, another stopping rule is met, or the caller stops iterating the generator.
+         The reason of the stop is saved in stop_reason (see stopping).
+
+         The solutions are yielded as immutable records (see Solver.encode), since the
+         pallets the search is working on keep changing. They can be kept, and turned into
+         pallets with Solver.decode (without assigning the orderlines while the search is
+         in progress).
+
+         :param maxtime: <float> The available computational time after the greedy solution (optional).
+         :param betarange: The range of the parameter of the biased randomisation.
+         :param mingamma: The minimum entity of the destruction process.
+         :param gammastep: The increase of gamma every time a best solution is not found.
+         :param deadline: <float> The time (as returned by time.time) at which the search
+                        must stop (optional).
+         :param cancel: <threading.Event> A token that stops the search when set, i.e.,
+                        any object with an is_set method (optional).
+         :param restart: <bool> If True, each solution is generated from scratch, without
+                        destruction and reconstruction, as in the multi start.
+         :param stopping: <StoppingRule> Other rules that stop the search (optional).
+
+         :return: <generator<Improvement>> The improvements of the best solution, whose
+                    solutions are records. When
+                    exhausted, the generator returns the number of iterations made.
+        """
         # Move useful data to the stack
         heuristic = self.heuristic
         destruction = self.destruction
-        getCost = self.getCost
-        dists = self.dists
-        orderlines = self.orderlines
+        solutionCost = self.solutionCost
         save = self.history.append
-        lazy_paths = self.lazy_paths
+        begin = time.time()
 
         # Init the entity of the destruction process
         gamma = mingamma
 
         # Generate a starting solution and set the starting best solution
-        bestSol, bestSolEdges = heuristic(GREEDY_BETA)
-        bestCost = getCost( lazy_paths(bestSol), dists)
+        bestSol, bestSolEdges = self._greedy()
+        bestCost = solutionCost(bestSol)
         currentSol, currentEdges = list(bestSol), list(bestSolEdges)
-        currentCost = bestCost  
+        currentCost = bestCost
+
+        # Build the rules that stop the search
+        rules = []
+        if maxtime is not None: rules.append(TimeLimit(maxtime))
+        if deadline is not None: rules.append(Deadline(deadline))
+        if cancel is not None: rules.append(Cancelled(cancel))
+        if stopping is not None: rules.append(stopping)
+        stop = AnyOf(*rules)
+        self.stop_reason = None
 
         # Start a multistart iterated local search
         iterations = 0
-        start = time.time()
+        state = SearchState(bestCost, time.time())
+
+        self.best = self.encode(bestSol, bestCost, bestSolEdges)
+        yield Improvement(self.best, bestCost, state.start - begin, iterations)
 
-        while time.time() - start < maxtime:
+        while True:
+            state.now = time.time()
+            if (reason := stop.check(state)) is not None:
+                break
             iterations += 1
 
-            if gamma >= len(currentEdges):
+            if restart or gamma >= len(currentEdges):
                 # New solution from scratch
                 beta = random.uniform(*betarange)
                 newSol, newEdges = heuristic(beta)
-                newCost = getCost(lazy_paths(newSol), dists)
+                newCost = solutionCost(newSol)
             else:
                 # Destruction and reconstruction process...
                 # Destruction process 
@@ -445,21 +961,58 @@ class Solver (object):
                 # Generate a new solution
                 beta = random.uniform(*betarange)
                 newSol, newEdges = heuristic(beta, palletsList=destroyedSol, solutionEdges=destroyedEdges)
-                newCost = getCost(lazy_paths(newSol), dists)
+                newCost = solutionCost(newSol)
 
             # Eventually update the best and the current
+            # NOTE: When solutions are generated from scratch, the current is
+            # always the best, because it is replaced only by better solutions.
+            improved = False
             if newCost < currentCost:
                 currentSol, currentEdges, currentCost = newSol, newEdges, newCost
                 if newCost < bestCost:
-                    bestSol, bestCost = newSol, newCost
+                    bestSol, bestSolEdges, bestCost = newSol, newEdges, newCost
                     gamma = mingamma 
+                    improved = True
                 else:
                     gamma = min(gamma + gammastep, len(currentEdges))
 
             # Save the current best
             save(bestCost)
 
-        return bestSol, bestCost, iterations
+            state.iterations = iterations
+            if improved:
+                state.improve(bestCost)
+                self.best = self.encode(bestSol, bestCost, bestSolEdges)
+                yield Improvement(self.best, bestCost, time.time() - begin, iterations)
+
+        self.stop_reason = reason
+        return iterations
+
+
+    def _greedy (self):
+        """
+        This method generates the starting solution of a search with the greedy
+        heuristic, starting from the solution set by warm_start, if any.
+        """
+        seed, self.seed = self.seed, None
+        if seed is None:
+            return self.heuristic(GREEDY_BETA)
+        return self.heuristic(GREEDY_BETA, *seed)
+
+
+    @staticmethod
+    def _exhaust (search):
+        """
+        This method runs an anytime search (see anytime) until the end.
+
+        :param search: <generator<Improvement>> The search.
+        :return: <tuple> The last improvement yielded and the number of iterations made.
+        """
+        while True:
+            try:
+                best = next(search)
+            except StopIteration as stop:
+                return best, stop.value
 
 
     def sequential (self):
@@ -470,45 +1023,46 @@ class Solver (object):
 
         This is used to compare the proposed procedure in the __call__ method
         with a different approach where routing and packing are not solved together.
+        The open pallets are indexed by their residual volume and weight (see packing.bins), so
+        that it scales to large instances.
         """
-        pallet_size, pallet_max_weight = self.pallet_size, self.pallet_max_weight
+        rejections = self.rejections
+        pack = self.packer.pack
         palletsList = []
         # First build a pallet for each orderline (dummy solution)
         for orderline in self.orderlines:
-            p = Pallet(pallet_size, pallet_max_weight)
-            done, packedCases, layersMap = dubePacker(p, orderline)
-            assert done == True
-            p.cases, p.layersMap = packedCases, layersMap
-            p.weight = orderline.weight
-            p.volume = orderline.volume
+            p = self._single(orderline)
             orderline.pallet = p
-            p.orderlines.add(orderline)
             palletsList.append(p)
 
         # Sort palletsList for decreasing strength
         palletsList.sort(key=lambda i: i.cases[0].strength, reverse=True)
 
-        # For each couple of different pallets...
-        for iPallet, jPallet in itertools.permutations(palletsList, 2):
-            # If both are active (have not been merged into others).
-            if iPallet.active and jPallet.active:
-                # Control the volumetric lower bound
-                if iPallet.volume + jPallet.volume > iPallet.maxVolume:
-                    continue
-                # Control the weight lower bound
-                if iPallet.weight + jPallet.weight > iPallet.maxWeight:
+        # Each pallet is merged into the first open pallet that can host it, among the
+        # ones with enough room, for increasing residual volume (i.e., best-fit decreasing
+        # on the strength of the cases). If no open pallet can host it, it is opened.
+        openPallets = OpenPallets()
+        for hosted in palletsList:
+            for host in openPallets.candidates(hosted):
+                # Control the necessary conditions (e.g., volumetric and weight lower bounds)
+                if (reason := reject(host, hosted)) is not None:
+                    rejections[reason] += 1
                     continue
                 # Try merging
-                done, packedCases, layersMap = dubePacker(iPallet, jPallet)
-                if done:
-                    iPallet.cases = packedCases
-                    iPallet.layersMap = layersMap
-                    iPallet.weight += jPallet.weight
-                    iPallet.volume += jPallet.volume
-                    iPallet.orderlines.update(jPallet.orderlines)
-                    jPallet.active = False
-                    for line in jPallet.orderlines:
-                        line.pallet = iPallet
+                if pack(host, hosted):
+                    openPallets.remove(host)
+                    merge(host, hosted)
+                    host.weight += hosted.weight
+                    host.volume += hosted.volume
+                    host.orderlines.update(hosted.orderlines)
+                    host.sorted_orderlines.extend(hosted.sorted_orderlines)
+                    hosted.active = False
+                    for line in hosted.orderlines:
+                        line.pallet = host
+                    openPallets.add(host)
+                    break
+            else:
+                openPallets.add(hosted)
         # Remove non-active pallets
         palletsList = list(filter(operator.attrgetter("active"), palletsList))
         return palletsList
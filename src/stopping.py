@@ -0,0 +1,250 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import abc
+import time
+
+
+
+class SearchState (object):
+    """
+    An instance of this class is the state of a search, updated by the solver
+    at each iteration, on which the stopping rules are evaluated.
+    """
+    __slots__ = ("start", "now", "iterations", "cost", "lastIteration", "lastTime")
+
+    def __init__ (self, cost, start=None):
+        """
+        Constructor.
+
+        :attr start: <float> The time at which the search started.
+        :attr now: <float> The current time.
+        :attr iterations: <int> The number of iterations made.
+        :attr cost: <float> The cost of the best solution found so far.
+        :attr lastIteration: <int> The iteration in which the best solution has been found.
+        :attr lastTime: <float> The time at which the best solution has been found.
+        """
+        self.start = self.now = self.lastTime = time.time() if start is None else start
+        self.iterations = self.lastIteration = 0
+        self.cost = cost
+
+
+    def improve (self, cost):
+        """
+        Update the state after an improvement of the best solution.
+
+        :param cost: <float> The cost of the new best solution.
+        """
+        self.cost, self.lastIteration, self.lastTime = cost, self.iterations, self.now
+
+
+
+class StoppingRule (abc.ABC):
+    """
+    An instance of this class is a criterion that stops a search. Each rule
+    has a reason, which is reported by the solver when the rule stops the search.
+
+    Rules can be combined with the | operator: the combination stops the search as
+    soon as any of its rules does, and reports the reason of the first of them.
+    """
+    reason = None
+
+    @abc.abstractmethod
+    def __call__ (self, state):
+        """
+        This method returns True if the search must stop.
+
+        :param state: <SearchState> The state of the search.
+        :return: <bool> True if the search must stop and False otherwise.
+        """
+
+
+    def check (self, state):
+        """
+        This method returns the reason why the search must stop, or None
+        if it can go on.
+
+        :param state: <SearchState> The state of the search.
+        :return: <str> The reason of the stop.
+        """
+        return self.reason if self(state) else None
+
+
+    def __or__ (self, other):
+        return AnyOf(self, other)
+
+
+
+class AnyOf (StoppingRule):
+    """
+    The combination of many rules, which stops the search as soon as any of them does.
+    """
+    def __init__ (self, *rules):
+        """
+        Constructor.
+
+        :attr rules: <list<StoppingRule>> The rules combined, in the order in which they are checked.
+        """
+        self.rules = []
+        for rule in rules:
+            self.rules.extend(rule.rules if isinstance(rule, AnyOf) else (rule,))
+
+
+    def __call__ (self, state):
+        return self.check(state) is not None
+
+
+    def check (self, state):
+        for rule in self.rules:
+            if (reason := rule.check(state)) is not None:
+                return reason
+        return None
+
+
+
+class TimeLimit (StoppingRule):
+    """
+    Stops the search when the available computational time is over.
+    """
+    reason = "time"
+
+    def __init__ (self, maxtime):
+        """
+        Constructor.
+
+        :attr maxtime: <float> The available computational time (in seconds).
+        """
+        self.maxtime = maxtime
+
+    def __call__ (self, state):
+        return state.now - state.start >= self.maxtime
+
+
+
+class Deadline (StoppingRule):
+    """
+    Stops the search at a given time.
+    """
+    reason = "deadline"
+
+    def __init__ (self, deadline):
+        """
+        Constructor.
+
+        :attr deadline: <float> The time (as returned by time.time) at which the search must stop.
+        """
+        self.deadline = deadline
+
+    def __call__ (self, state):
+        return state.now >= self.deadline
+
+
+
+class IterationLimit (StoppingRule):
+    """
+    Stops the search after a maximum number of iterations.
+    """
+    reason = "iterations"
+
+    def __init__ (self, maxiterations):
+        """
+        Constructor.
+
+        :attr maxiterations: <int> The maximum number of iterations.
+        """
+        self.maxiterations = maxiterations
+
+    def __call__ (self, state):
+        return state.iterations >= self.maxiterations
+
+
+
+class Stagnation (StoppingRule):
+    """
+    Stops the search when the best solution has not improved for a number of
+    iterations, or for a number of seconds, whichever comes first.
+    """
+    reason = "stagnation"
+
+    def __init__ (self, iterations=None, seconds=None):
+        """
+        Constructor.
+
+        :attr iterations: <int> The iterations without improvement after which the search stops (optional).
+        :attr seconds: <float> The time without improvement after which the search stops (optional).
+        """
+        self.iterations = iterations
+        self.seconds = seconds
+
+    def __call__ (self, state):
+        return ((self.iterations is not None and state.iterations - state.lastIteration >= self.iterations)
+                or (self.seconds is not None and state.now - state.lastTime >= self.seconds))
+
+
+
+class TargetCost (StoppingRule):
+    """
+    Stops the search when the cost of the best solution reaches a target.
+    """
+    reason = "target"
+
+    def __init__ (self, target):
+        """
+        Constructor.
+
+        :attr target: <float> The cost considered good enough.
+        """
+        self.target = target
+
+    def __call__ (self, state):
+        return state.cost <= self.target
+
+
+
+class Gap (StoppingRule):
+    """
+    Stops the search when the cost of the best solution is close enough to a lower
+    bound, i.e., when (cost - bound) / bound does not exceed the given gap.
+    """
+    reason = "gap"
+
+    def __init__ (self, bound, gap):
+        """
+        Constructor.
+
+        :attr bound: <float> The lower bound of the cost.
+        :attr gap: <float> The relative gap to the lower bound (e.g., 0.01 for 1%).
+        """
+        self.bound = bound
+        self.gap = gap
+
+    def __call__ (self, state):
+        return state.cost - self.bound <= self.gap * abs(self.bound)
+
+
+
+class Cancelled (StoppingRule):
+    """
+    Stops the search when an external cancel token is set.
+    """
+    reason = "cancelled"
+
+    def __init__ (self, token):
+        """
+        Constructor.
+
+        :attr token: <threading.Event> The cancel token, i.e., any object with an is_set method.
+        """
+        self.token = token
+
+    def __call__ (self, state):
+        return self.token.is_set()
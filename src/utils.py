@@ -24,7 +24,7 @@ from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
 from packing.orderline import OrderLine
 from packing.case import Case
-from packing.edge import Edge
+from packing.edge import Edge, EdgeTable
 
 # To ignore the warnings generated by matplotlib in occasion of plotting
 import warnings
@@ -53,14 +53,116 @@ def readfile (filename, delimiter=","):
 
 
 
-def get_edges (orderlines, dists):
+# The number of orderlines whose partners are selected together in the sparse
+# mode of get_edges. It limits the size of the matrices of savings built.
+EDGES_BLOCK_SIZE = 1024
+
+
+def _partners (orderlines, dists, k, nearest=False, first=0, dead=None):
+    """
+    This method selects for each orderline its k best partners, i.e., the
+    orderlines with the highest saving or, alternatively, the nearest ones.
+
+    :param orderlines: <list<OrderLine>> The orderlines.
+    :param dists: <numpy.array> The matrix of distances between locations.
+    :param k: <int> The number of partners of each orderline.
+    :param nearest: <bool> True to select the nearest orderlines instead of the
+                    ones with the highest saving.
+    :param first: <int> The index of the first orderline whose partners are
+                    selected (the previous ones are only considered as partners).
+    :param dead: <numpy.array> For each orderline, True if it cannot be selected
+                    as a partner (e.g., it has been removed from the problem).
+    :return: <list<tuple>> The couples of orderlines (i, j), with i < j, in the
+            order in which they would be generated by itertools.combinations.
+    """
+    locations = np.fromiter((line.location for line in orderlines), dtype=np.int64, count=len(orderlines))
+    depot = np.asarray(dists[0, locations], dtype=float)
+    L = len(orderlines)
+    pairs = set()
+    for start in range(first, L, EDGES_BLOCK_SIZE):
+        rows = np.arange(start, min(start + EDGES_BLOCK_SIZE, L))
+        cost = np.asarray(dists[np.ix_(locations[rows], locations)], dtype=float)
+        # The orderlines are sorted from the best partner, excluding themselves
+        score = cost if nearest else cost - depot[rows, None] - depot[None, :]
+        score[np.arange(len(rows)), rows] = np.inf
+        if dead is not None:
+            score[:, dead] = np.inf
+        best = np.argpartition(score, k - 1, axis=1)[:, :k]
+        for i, partners in zip(rows.tolist(), best.tolist()):
+            pairs.update((i, j) if i < j else (j, i) for j in partners)
+    return sorted(pairs)
+
+
+def get_edges (orderlines, dists, k=None, nearest=False):
     """
     Given a set of orderlines (each of them with an associated storage location)
     and a matrix of distances, this method returns the set of edges to consider.
 
+    The edges are returned as an EdgeTable, i.e., their costs and savings are computed
+    all together, and the Edge objects are only created when needed.
+
+    By default, all the couples of orderlines are connected. In the sparse mode (i.e.,
+    when k is provided), each orderline is only connected to its k best partners (see
+    _partners), so that the number of edges grows linearly with the orderlines.
+
+    :param k: <int> The number of partners of each orderline in the sparse mode.
+    :param nearest: <bool> In the sparse mode, True to select the nearest partners
+                    instead of the ones with the highest saving.
+    """
+    _depot_edges(orderlines, dists)
+
+    # Generate the edges connecting the locations to each other, in the same
+    # order of itertools.combinations.
+    if k is not None and k < len(orderlines) - 1:
+        origin, end = np.array(_partners(orderlines, dists, k, nearest), dtype=np.int64).reshape(-1, 2).T
+    else:
+        origin, end = np.triu_indices(len(orderlines), 1)
+
+    return EdgeTable(orderlines, origin, end, *_costs(orderlines, dists, origin, end))
+
+
+def extend_edges (edges, orderlines, dists, k=None, nearest=False, removed=()):
+    """
+    This method adds new orderlines to a table of edges (see get_edges), with
+    the edges connecting them to each other and to the orderlines already in
+    the table, except the removed ones. The edges already in the table are kept
+    unchanged.
+
+    :param edges: <EdgeTable> The table to extend.
+    :param orderlines: <list<OrderLine>> The new orderlines.
+    :param k: <int> The number of partners of each new orderline in the sparse mode.
+    :param nearest: <bool> In the sparse mode, True to select the nearest partners
+                    instead of the ones with the highest saving.
+    :param removed: <list<OrderLine>> The orderlines of the table no longer in the
+                    problem, which are not connected to the new ones.
+    """
+    _depot_edges(orderlines, dists)
+
+    # Generate the edges connecting the new locations to all the others,
+    # in the same order of itertools.combinations.
+    old, lines = len(edges.orderlines), edges.orderlines + tuple(orderlines)
+    removed = {id(line) for line in removed}
+    dead = np.fromiter((id(line) in removed for line in lines), dtype=bool, count=len(lines))
+    if k is not None and k < len(lines) - int(dead.sum()) - 1:
+        origin, end = np.array(_partners(lines, dists, k, nearest, old, dead), dtype=np.int64).reshape(-1, 2).T
+    else:
+        # For each orderline, the first new orderline after it
+        L = len(lines)
+        first = np.maximum(np.arange(1, L + 1), old)
+        counts = L - first
+        origin = np.repeat(np.arange(L), counts)
+        end = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first, counts)
+        alive = ~(dead[origin] | dead[end])
+        origin, end = origin[alive], end[alive]
+
+    edges.extend(orderlines, origin, end, *_costs(lines, dists, origin, end))
+    return edges
+
+
+def _depot_edges (orderlines, dists):
+    """
+    Generate for each OrderLine the edges connecting its location to the depot.
     """
-    # Generate for each OrderLine the edges connecting its location
-    # to the depot.
     for line in orderlines:
         cost = dists[0, line.location]
         dn = Edge(None, line, cost, 0)
@@ -70,20 +172,16 @@ def get_edges (orderlines, dists):
         line.dn_edge = dn
         line.nd_edge = nd
 
-    # Generate the edges connecting the locations to each other.
-    edges = []
-    for i, j in itertools.combinations(range(len(orderlines)), 2):
-        origin = orderlines[i]
-        end = orderlines[j]
-        cost = dists[origin.location, end.location]
-        saving = origin.nd_edge.cost + end.dn_edge.cost - cost
-        direct = Edge(origin, end, cost, saving)
-        inv = Edge(end, origin, cost, saving)
-        direct.inverse = inv
-        inv.inverse = direct
-        edges.append(direct)
-
-    return tuple(edges)
+
+def _costs (orderlines, dists, origin, end):
+    """
+    Returns the costs and the savings of the edges connecting the orderlines.
+    """
+    locations = np.fromiter((line.location for line in orderlines), dtype=np.int64, count=len(orderlines))
+    depot = dists[0, locations]
+    cost = dists[locations[origin], locations[end]]
+    saving = depot[origin] + depot[end] - cost
+    return cost, saving
 
 
 def _cuboid_data2(o, size=(1,1,1)):
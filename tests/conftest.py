@@ -0,0 +1,79 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import os
+import sys
+import pytest
+
+# The tests import the modules as the scripts in src do
+TESTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS), "src"))
+
+import utils
+import warehouse
+
+
+# The pallets used by the real tests
+PALLET_SIZE = (140, 110, 150)
+PALLET_MAX_WEIGHT = 1200
+
+
+
+@pytest.fixture
+def readtest ():
+    """
+    Returns a method that reads the orderlines of a real test (e.g., readtest(1)
+    for tests/test1.csv).
+    """
+    def read (i):
+        return utils.readfile(os.path.join(TESTS, f"test{i}.csv"))
+    return read
+
+
+
+@pytest.fixture
+def dists ():
+    """
+    The matrix of distances between the locations of the warehouse.
+    """
+    return warehouse.distance_matrix
+
+
+
+@pytest.fixture
+def newPallet ():
+    """
+    Returns a method that builds an empty pallet of the real tests.
+    """
+    from packing.pallet import Pallet
+    return lambda: Pallet(PALLET_SIZE, PALLET_MAX_WEIGHT)
+
+
+
+@pytest.fixture
+def feasible ():
+    """
+    Returns a method that verifies a pallet, placing again each of its cases, in the
+    order in which they have been packed, through packing.packer.fit. It returns True
+    if each case fits where it is, and holds the same number of cases computed by fit.
+    """
+    from packing.packer import fit
+
+    def check (pallet):
+        packed, layersMap = [], {}
+        for case in pallet.cases:
+            c = case.__copy__()
+            if not fit(c, pallet, packed, layersMap) or c.canHold != case.canHold:
+                return False
+            packed.append(c)
+        return True
+    return check
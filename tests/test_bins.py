@@ -0,0 +1,81 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import random
+import pytest
+
+from packing.bins import OpenPallets
+
+
+
+def _pallets (rnd, newPallet, n):
+    """
+    Returns some pallets with random volume and weight (with many equal volumes).
+    """
+    palletsList = []
+    for _ in range(n):
+        pallet = newPallet()
+        pallet.volume = rnd.randint(0, 20) * pallet.maxVolume / 20
+        pallet.weight = rnd.uniform(0, pallet.maxWeight)
+        palletsList.append(pallet)
+    return palletsList
+
+
+
+def _expected (openPallets, hosted, order):
+    """
+    The open pallets that can receive the cases of another pallet, for increasing
+    residual volume and, with the same residual volume, in the order in which they
+    have been opened (i.e., their order).
+    """
+    residual = OpenPallets.residual
+    fits = [p for p in openPallets if residual(p)[0] >= hosted.volume and residual(p)[1] >= hosted.weight]
+    return sorted(fits, key=lambda p: (residual(p)[0], order[id(p)]))
+
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_open_pallets (seed, newPallet):
+    rnd = random.Random(seed)
+    openPallets = OpenPallets(blockSize=4)
+    palletsList = _pallets(rnd, newPallet, 100)
+    order = {id(p): i for i, p in enumerate(palletsList)}
+    for pallet in palletsList:
+        openPallets.add(pallet)
+    assert len(openPallets) == 100 and len(openPallets.keys) > 1
+
+    # The pallets are kept by increasing residual volume, and each block knows its largest residual weight
+    keys = [OpenPallets.residual(p)[0] for p in openPallets]
+    assert keys == sorted(keys) and sum(openPallets.keys, []) == keys
+    for pallets, maxWeight in zip(openPallets.pallets, openPallets.maxWeights):
+        assert maxWeight == max(OpenPallets.residual(p)[1] for p in pallets)
+
+    hostedPallets = _pallets(rnd, newPallet, 30)
+    for hosted in hostedPallets:
+        hosted.volume /= 2
+        assert list(openPallets.candidates(hosted)) == _expected(openPallets, hosted, order)
+
+    # Remove some pallets, and add them again after changing their volume and weight
+    for pallet in rnd.sample(palletsList, 60):
+        openPallets.remove(pallet)
+        assert pallet not in list(openPallets)
+        if rnd.random() < 0.5:
+            pallet.volume = min(pallet.maxVolume, pallet.volume + pallet.maxVolume / 10)
+            pallet.weight = min(pallet.maxWeight, pallet.weight + 100)
+            order[id(pallet)] = len(order)
+            openPallets.add(pallet)
+        for hosted in hostedPallets[:5]:
+            assert list(openPallets.candidates(hosted)) == _expected(openPallets, hosted, order)
+    assert all(len(pallets) <= 8 for pallets in openPallets.pallets)
+
+    with pytest.raises(ValueError):
+        openPallets.remove(newPallet())
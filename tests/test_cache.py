@@ -0,0 +1,159 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import sys
+import random
+
+import utils
+from solver import Solver
+from packing.cache import PackingCache, InfeasibleCache, _sizeof
+from packing.orderline import OrderLine
+from packing.packer import dubePacker
+
+
+
+def _content (pallet):
+    """
+    Returns the cases of a pallet with their positions, and the layers of its orderlines.
+    """
+    cases = [(c.orderline.code, c.x, c.y, c.z, c.sizex, c.sizey, c.rotated, c.canHold) for c in pallet.cases]
+    return cases, dict(pallet.layersMap)
+
+
+
+def _fill (orderlines, newPallet, cache=None):
+    """
+    Packs the orderlines one after the other in a pallet, and returns its content
+    and the result of each packing.
+    """
+    pallet = newPallet()
+    results = [dubePacker(pallet, line, cache)[0] for line in orderlines]
+    return _content(pallet), results
+
+
+
+def _bytes (cache):
+    """
+    Returns the memory of a cache computed from scratch.
+    """
+    return sum(size for _, size, _ in cache.entries.values()) + sum(size for _, size in cache.shared.values())
+
+
+
+def test_packing_cache_same_packing (readtest, newPallet):
+    orderlines = readtest(1)
+    cache = PackingCache()
+    plain = _fill(orderlines, newPallet)
+    assert _fill(orderlines, newPallet, cache) == plain
+    assert False in plain[1]
+
+    # The same packings are read from the cache, including the failed ones
+    hits, misses = cache.hits, cache.misses
+    assert _fill(orderlines, newPallet, cache) == plain
+    assert cache.hits == hits + len(orderlines) and cache.misses == misses
+
+
+
+def test_packing_cache_memory (readtest, newPallet):
+    orderlines = readtest(1)
+    cache = PackingCache()
+    _fill(orderlines, newPallet, cache)
+    assert cache.currbytes == _bytes(cache)
+
+    # A small cache evicts the least recently used results
+    small = PackingCache(cache.currbytes // 3)
+    _fill(orderlines, newPallet, small)
+    assert small.evictions > 0 and 0 < len(small) < len(cache)
+    assert small.currbytes == _bytes(small) <= small.maxbytes
+    assert set(small.shared) == {id(palletKey) for _, _, palletKey in small.entries.values()}
+
+    cache.clear()
+    assert len(cache) == cache.currbytes == cache.hits == cache.misses == 0 and not cache.shared
+
+
+
+def test_packing_cache_shared_key ():
+    palletKey = tuple(range(1000, 1100))
+    cache = PackingCache()
+    cache.put((palletKey, (1,)), False)
+    first = cache.currbytes
+    cache.put((palletKey, (2,)), False)
+
+    # The part of the keys shared by the results is counted once
+    assert cache.currbytes == 2 * first - _sizeof(palletKey)
+    cache.put((palletKey, (1,)), True)
+    assert cache.currbytes == _bytes(cache)
+
+    # And forgotten with the last of them
+    cache.maxbytes = 0
+    cache.put((tuple(range(2000, 2001)), (1,)), False)
+    assert len(cache) == 0 and cache.currbytes == 0 and not cache.shared
+
+
+
+def test_sizeof ():
+    obj = (1000, (2000, 3000), 1)
+    assert _sizeof(obj) == sys.getsizeof(obj) + 3 * sys.getsizeof(1000) + sys.getsizeof((2000, 3000))
+
+
+
+def test_infeasible_cache_signatures ():
+    a, b, c = OrderLine("A", 1), OrderLine("B", 2), OrderLine("C", 3)
+    cache = InfeasibleCache()
+    ab, ba = cache.leaf((a, b)), cache.leaf((b, a))
+    assert cache.leaf((a, b)) == ab != ba
+
+    # The same mergings always lead to the same signature, and different ones never do
+    sc = cache.leaf((c,))
+    merged = cache.merged(ab, sc)
+    assert cache.merged(ab, sc) == merged
+    signatures = [ab, ba, sc, merged, cache.merged(sc, ab), cache.appended(ab, (c,)), cache.unique()]
+    assert len(set(signatures)) == len(signatures)
+    assert cache.merged(ab, None) is None and cache.appended(None, (c,)) is None
+
+
+
+def test_infeasible_cache_entries ():
+    cache = InfeasibleCache(maxentries=2)
+    cache.put(0, 1)
+    cache.put(1, 2)
+    assert cache.get(0, 1) and not cache.get(1, 0)
+    assert cache.get(None, 1) is False and cache.hits == 1 and cache.misses == 1
+
+    # The least recently used merging is evicted
+    cache.put(2, 3)
+    assert not cache.get(1, 2) and cache.get(0, 1) and cache.get(2, 3)
+
+    # The signatures forgotten are never assigned again
+    a, b, c = OrderLine("A", 1), OrderLine("B", 2), OrderLine("C", 3)
+    first = [cache.leaf((line,)) for line in (a, b)]
+    assert cache.leaf((c,)) not in first and cache.leaf((a,)) not in first
+    cache.clear()
+    assert len(cache) == 0 and not cache.signatures and cache.hits == cache.misses == 0
+
+
+
+def test_infeasible_cache_same_solutions (readtest, dists):
+    orderlines = readtest(12)
+    edges = utils.get_edges(orderlines, dists)
+    solutions = []
+    for maxentries in (0, 1000):
+        solver = Solver(orderlines, edges, dists, (140, 110, 150), 1200, infeasible_maxentries=maxentries)
+        result = []
+        for seed in range(3):
+            random.seed(seed)
+            sol, _ = solver.heuristic(0.3)
+            result.append(sorted(sorted((c.orderline.code, c.x, c.y, c.z, c.rotated) for c in p.cases) for p in sol))
+        solutions.append(result)
+    # The mergings known to be infeasible are not tried again, without changing the solutions
+    assert solver.rejections["infeasible"] > 0
+    assert solutions[0] == solutions[1]
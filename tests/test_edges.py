@@ -0,0 +1,158 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import itertools
+import numpy as np
+import pytest
+
+import utils
+from packing.orderline import OrderLine
+from packing.edge import Edge, EdgeTable
+
+
+
+def _problem (seed, n):
+    """
+    Returns a random symmetric matrix of distances without ties, and the orderlines
+    in distinct locations.
+    """
+    rnd = np.random.default_rng(seed)
+    dists = rnd.uniform(1, 100, (n + 1, n + 1))
+    dists = dists + dists.T
+    np.fill_diagonal(dists, 0)
+    locations = rnd.permutation(np.arange(1, n + 1))
+    return tuple(OrderLine(str(i), int(location)) for i, location in enumerate(locations)), dists
+
+
+
+def _best (orderlines, dists, i, k, nearest):
+    """
+    Returns the k best partners of an orderline, computed one by one.
+    """
+    def score (j):
+        a, b = orderlines[i].location, orderlines[j].location
+        return dists[a, b] if nearest else dists[a, b] - dists[0, a] - dists[0, b]
+    return set(sorted((j for j in range(len(orderlines)) if j != i), key=score)[:k])
+
+
+
+@pytest.mark.parametrize("seed, k, nearest", ((0, 1, False), (1, 3, False), (2, 5, True), (3, 8, True)))
+def test_sparse_edges (seed, k, nearest, monkeypatch):
+    orderlines, dists = _problem(seed, 40)
+    # Small blocks of orderlines, to select the partners in many blocks
+    monkeypatch.setattr(utils, "EDGES_BLOCK_SIZE", 7)
+    edges = utils.get_edges(orderlines, dists, k, nearest)
+    pairs = list(zip(edges.origins, edges.ends))
+
+    # Each couple is connected once, in the order of itertools.combinations
+    assert pairs == sorted(set(pairs)) and all(i < j for i, j in pairs)
+
+    # The edges connect each orderline to its best partners, and each couple
+    # is connected if any of the two orderlines is among the best partners of the other
+    best = [_best(orderlines, dists, i, k, nearest) for i in range(len(orderlines))]
+    assert set(pairs) == {(min(i, j), max(i, j)) for i in range(len(orderlines)) for j in best[i]}
+    partners = [set() for _ in orderlines]
+    for i, j in pairs:
+        partners[i].add(j)
+        partners[j].add(i)
+    assert all(len(p) >= k and best[i] <= p for i, p in enumerate(partners))
+
+    # The edges can be used in both directions, with the same cost and saving
+    for edge in edges:
+        a, b = edge.origin.location, edge.end.location
+        assert edge.cost == dists[a, b] and edge.saving == pytest.approx(dists[0, a] + dists[0, b] - dists[a, b])
+        assert (edge.inverse.origin, edge.inverse.end, edge.inverse.cost, edge.inverse.saving) == \
+            (edge.end, edge.origin, edge.cost, edge.saving)
+
+    # The depot edges are always there
+    for line in orderlines:
+        assert line.dn_edge.origin is None and line.dn_edge.end is line
+        assert line.nd_edge.origin is line and line.nd_edge.end is None
+        assert line.dn_edge.cost == line.nd_edge.cost == dists[0, line.location]
+        assert line.dn_edge.inverse is line.nd_edge and line.nd_edge.inverse is line.dn_edge
+
+
+
+def test_dense_edges ():
+    orderlines, dists = _problem(0, 12)
+    # With as many partners as orderlines, all the couples are connected
+    for k in (None, 11, 20):
+        edges = utils.get_edges(orderlines, dists, k)
+        assert list(zip(edges.origins, edges.ends)) == list(itertools.combinations(range(12), 2))
+
+
+
+def _rows (edges):
+    """
+    Returns the orderlines, the cost, and the saving of each edge of a table.
+    """
+    return [(e.origin, e.end, e.cost, e.saving) for e in edges]
+
+
+
+def test_edge_table ():
+    orderlines, dists = _problem(0, 20)
+    edges = utils.get_edges(orderlines, dists, 4)
+    assert not edges.created
+
+    # The Edge objects are created when accessed, once
+    edge = edges[5]
+    assert edges[5] is edge and edges[5].inverse is edge.inverse and edge.inverse.inverse is edge
+    assert len(edges.created) == 1
+    assert (edge.origin, edge.end) == (orderlines[edges.origins[5]], orderlines[edges.ends[5]])
+    assert (edge.cost, edge.saving) == (edges.cost[5], edges.saving[5])
+    assert isinstance(edge.cost, float) and isinstance(edge.saving, float)
+    assert edges.indexOf(edge) == edges.indexOf(edge.inverse) == 5
+    assert list(edges)[5] is edge and all(edges.indexOf(e) == i for i, e in enumerate(edges))
+    rows = _rows(edges)
+
+    # Pruning keeps the Edge objects already created, and their costs and savings
+    keep = np.arange(len(edges)) % 3 != 0
+    created = list(edges)
+    edges.prune(keep)
+    kept = [e for e, k in zip(created, keep) if k]
+    assert len(edges) == len(kept) and all(edges[i] is e for i, e in enumerate(kept))
+    assert _rows(edges) == [r for r, k in zip(rows, keep) if k]
+    assert all(edges.indexOf(e) == edges.indexOf(e.inverse) == i for i, e in enumerate(kept))
+    removed = created[0]
+    with pytest.raises(KeyError):
+        edges.indexOf(removed)
+
+    # Extending does not change the orderlines and the edges already in the table
+    newLines = tuple(OrderLine(str(20 + i), orderlines[i].location) for i in range(3))
+    before = len(edges)
+    origin, end = np.array([0, 20, 21]), np.array([20, 21, 22])
+    locations = np.array([line.location for line in orderlines + newLines])
+    cost = dists[locations[origin], locations[end]]
+    saving = dists[0, locations[origin]] + dists[0, locations[end]] - cost
+    edges.extend(newLines, origin, end, cost, saving)
+    assert edges.orderlines == orderlines + newLines and len(edges) == before + 3
+    assert all(edges[i] is e for i, e in enumerate(kept))
+    assert [(e.origin, e.end) for e in list(edges)[before:]] == [(orderlines[0], newLines[0]), newLines[:2], newLines[1:]]
+    assert edges.origins[before + 1] is edges.ends[before]
+
+
+
+def test_edge_table_from_edges ():
+    orderlines, dists = _problem(1, 6)
+    objects = []
+    for a, b in itertools.combinations(orderlines, 2):
+        edge = Edge(a, b, dists[a.location, b.location], 1.0)
+        edge.inverse = Edge(b, a, edge.cost, edge.saving, edge)
+        objects.append(edge)
+    edges = EdgeTable.fromEdges(orderlines, objects)
+
+    # The Edge objects provided are the ones of the table
+    assert len(edges) == len(objects) and all(edges[i] is e for i, e in enumerate(objects))
+    assert all(edges.indexOf(e) == edges.indexOf(e.inverse) == i for i, e in enumerate(objects))
+    assert list(zip(edges.origins, edges.ends)) == list(itertools.combinations(range(6), 2))
+    assert edges.cost.tolist() == [e.cost for e in objects] and edges.saving.tolist() == [1.0] * len(objects)
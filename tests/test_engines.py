@@ -0,0 +1,82 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import random
+import pytest
+
+import utils
+from solver import Solver
+from packing.case import Case
+from packing.engines import PackerEngine, DubeEngine, LayerEngine
+from packing.orderline import OrderLine
+
+
+
+ENGINES = (DubeEngine, LayerEngine)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("test", (1, 12, 14))
+def test_engine_single_orderlines (engine, test, readtest, newPallet, feasible):
+    # Every orderline fits in a pallet, also when it does not fit in rows and layers
+    pack = engine().pack
+    for line in readtest(test):
+        pallet = newPallet()
+        assert pack(pallet, line) and len(pallet.cases) == len(line.cases)
+        assert feasible(pallet)
+
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engine_merge (engine, readtest, newPallet, feasible):
+    orderlines = readtest(2)
+    pack = engine().pack
+    pallet = newPallet()
+    for line in orderlines[:3]:
+        assert pack(pallet, line)
+    assert feasible(pallet)
+
+    # A failed packing does not modify the pallet
+    cases = [(c.x, c.y, c.z, c.sizex, c.sizey) for c in pallet.cases]
+    layers = dict(pallet.layersMap)
+    assert not pack(pallet, orderlines[3].cases * 600)
+    assert [(c.x, c.y, c.z, c.sizex, c.sizey) for c in pallet.cases] == cases and pallet.layersMap == layers
+
+
+
+def test_layer_engine_solver (readtest, dists, feasible):
+    orderlines = readtest(12)
+    solver = Solver(orderlines, utils.get_edges(orderlines, dists), dists, (140, 110, 150), 1200, packer=LayerEngine())
+    for sol in (solver.heuristic(0.3)[0], solver.sequential()):
+        assert all(feasible(p) for p in sol)
+        # The solution is packed again by the DubeEngine
+        verified, _ = solver.verify(sol)
+        assert all(feasible(p) for p in verified)
+        assert sorted(id(line) for p in verified for line in p.orderlines) == sorted(map(id, orderlines))
+
+
+
+def test_unpackable_orderline (readtest, dists):
+    orderlines = readtest(2)
+    line = OrderLine("X", orderlines[0].location)
+    line.cases = (Case(line, "X", 200, 10, 10, 1, 1),)
+    orderlines = (*orderlines, line)
+    solver = Solver(orderlines, utils.get_edges(orderlines, dists), dists, (140, 110, 150), 1200)
+    for build in (lambda: solver.heuristic(0.3), solver.sequential):
+        with pytest.raises(ValueError, match="orderline X"):
+            build()
+
+
+
+def test_abstract_engine ():
+    with pytest.raises(TypeError):
+        PackerEngine()
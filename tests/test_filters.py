@@ -0,0 +1,75 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import pytest
+
+from packing import filters
+from packing.case import Case
+from packing.orderline import OrderLine
+from packing.packer import dubePacker
+
+
+
+def _pallet (newPallet, n, sizex, sizey, sizez, weight=1, strength=1):
+    """
+    Returns a pallet with the n identical cases of a new orderline.
+    """
+    line = OrderLine("A", 0)
+    line.cases = tuple(Case(line, "A", sizex, sizey, sizez, weight, strength) for _ in range(n))
+    pallet = newPallet()
+    assert dubePacker(pallet, line)[0]
+    pallet.orderlines, pallet.sorted_orderlines = {line}, [line]
+    pallet.weight = sum(c.weight for c in line.cases)
+    pallet.volume = sum(c.volume for c in line.cases)
+    return pallet
+
+
+
+# For each filter, two pallets that it rejects (given as the arguments of _pallet),
+# whose cases cannot be packed together. The pallets are 140x110x150 and can hold 1200.
+REJECTED = (
+    ("volume", (8, 70, 55, 50), (8, 70, 55, 50)),
+    ("weight", (1, 10, 10, 10, 700), (1, 10, 10, 10, 700)),
+    ("tall", (1, 140, 60, 80), (1, 140, 60, 80)),
+    ("wide", (2, 80, 80, 60), (2, 80, 80, 60)),
+    ("stack", (3, 70, 55, 10, 1, 0), (2, 70, 55, 10, 1, 0)),
+)
+
+
+@pytest.mark.parametrize("name, host, hosted", REJECTED)
+def test_filters_reject (name, host, hosted, newPallet):
+    host, hosted = _pallet(newPallet, *host), _pallet(newPallet, *hosted)
+    assert filters.reject(host, hosted) == name
+    # The filters are necessary conditions (the weight is not verified by the packer)
+    if name != "weight":
+        assert not dubePacker(host, hosted)[0]
+
+
+
+def test_filters_accept (newPallet):
+    host, hosted = _pallet(newPallet, 2, 70, 55, 10, 1, 0), _pallet(newPallet, 2, 70, 55, 10, 1, 0)
+    assert filters.reject(host, hosted) is None
+    assert dubePacker(host, hosted)[0]
+
+
+
+def test_filters_merge (readtest, newPallet):
+    orderlines = readtest(12)
+    host, hosted = newPallet(), newPallet()
+    assert dubePacker(host, orderlines[0])[0] and dubePacker(hosted, orderlines[1])[0]
+    filters.summary(host)
+    assert dubePacker(host, hosted)[0]
+    filters.merge(host, hosted)
+
+    # The summary statistics are the same computed from scratch
+    merged, host.summary = host.summary, None
+    assert merged == filters.summary(host)
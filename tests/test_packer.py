@@ -0,0 +1,216 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import collections
+import operator
+import pytest
+
+from packing import packer
+from packing.case import Case
+from packing.grid import SpatialGrid
+from packing.orderline import OrderLine
+from packing.packer import dubePacker, fit, _placeBlock
+
+
+# The real tests used to compare the packings
+TESTS = (7, 12, 15, 17)
+
+
+
+def _cases (pallet):
+    """
+    Returns the cases of a pallet with their positions, in the order in which they have been packed.
+    """
+    return [(c.orderline.code, c.x, c.y, c.z, c.sizex, c.sizey, c.rotated, c.canHold) for c in pallet.cases]
+
+
+
+def _case (x, y, z, sizex, sizey, sizez):
+    """
+    Returns a case of a new orderline placed in a given position.
+    """
+    case = Case(OrderLine("A", 0), "A", sizex, sizey, sizez, 1, 1)
+    case.setPosition((x, y, z))
+    return case
+
+
+
+def _lists (grid):
+    """
+    Returns the non-empty lists of a spatial grid.
+    """
+    return [{k: v for k, v in index.items() if v} for index in (grid.cells, grid.columns, grid.rows, grid.bands)]
+
+
+
+def _state (pallet):
+    """
+    Returns the cases and the layers of a pallet, with the state of its grid and its
+    extreme points, after they have been updated with all the cases.
+    """
+    pallet.grid.sync(pallet.cases)
+    pallet.points.sync(pallet.cases, pallet.grid)
+    grid = pallet.grid
+    return (_cases(pallet), dict(pallet.layersMap), len(grid), all(map(operator.is_, grid.cases, pallet.cases)),
+            _lists(grid), list(pallet.points))
+
+
+
+def _layout (orderlines, newPallet, **kwargs):
+    """
+    Packs each orderline in the first pallet where it fits, opening a new pallet
+    when it does not fit anywhere, and returns the cases and the layers of the pallets.
+    """
+    pallets = []
+    for line in orderlines:
+        if not any(dubePacker(p, line, **kwargs)[0] for p in pallets):
+            pallets.append(newPallet())
+            assert dubePacker(pallets[-1], line, **kwargs)[0]
+    return [(_cases(p), dict(p.layersMap)) for p in pallets]
+
+
+
+@pytest.mark.parametrize("test", TESTS)
+def test_grid_same_packing (test, readtest, newPallet, monkeypatch):
+    orderlines = readtest(test)
+    monkeypatch.setattr(packer, "GRID_MIN_CASES", 10 ** 9)
+    plain = _layout(orderlines, newPallet)
+    monkeypatch.setattr(packer, "GRID_MIN_CASES", 0)
+    assert _layout(orderlines, newPallet) == plain
+
+
+
+@pytest.mark.parametrize("test", TESTS)
+def test_vectorized_same_packing (test, readtest, newPallet, monkeypatch):
+    orderlines = readtest(test)
+    plain = _layout(orderlines, newPallet)
+    # Every case is placed by the vectorized mode, also on almost empty pallets
+    monkeypatch.setattr(packer, "VECTORIZED_MIN_POINTS", 0)
+    assert _layout(orderlines, newPallet, vectorized=True) == plain
+
+
+
+def test_grid_truncate (readtest, newPallet):
+    pallet = newPallet()
+    for line in readtest(1)[:4]:
+        assert dubePacker(pallet, line)[0]
+    cases = list(pallet.cases)
+    grid = SpatialGrid(pallet.size)
+    grid.sync(cases)
+    grid.truncate(len(cases) // 2)
+    expected = SpatialGrid(pallet.size)
+    expected.sync(cases[:len(cases) // 2])
+    assert grid.cases == expected.cases
+    assert _lists(grid) == _lists(expected)
+
+
+
+# The cases around a cavity of 14x11x15 at (56, 44, 0), which obstruct the
+# placement of a case in it from the left, right, front, back, and above.
+# The cavity is a cell of the spatial grid, so the cases around it are found
+# in different aggregations of the grid.
+CAVITY = (
+    (42, 44, 0, 14, 11, 15),
+    (70, 44, 0, 14, 11, 15),
+    (56, 33, 0, 14, 11, 15),
+    (56, 55, 0, 14, 11, 15),
+    (42, 33, 15, 42, 33, 10),
+)
+
+
+@pytest.mark.parametrize("missing", (None, *range(len(CAVITY))))
+def test_grid_obstructions (missing, newPallet):
+    pallet = newPallet()
+    packed = [_case(*c) for i, c in enumerate(CAVITY) if i != missing]
+    grid = SpatialGrid(pallet.size)
+    grid.sync(packed)
+    for g in (None, grid):
+        # The case can be placed only if one of the directions is free
+        assert fit(_case(56, 44, 0, 14, 11, 15), pallet, packed, {}, g) == (missing is not None)
+
+
+
+def test_rollback (readtest, newPallet):
+    orderlines = readtest(1)
+    pallet, other = newPallet(), newPallet()
+    for p in (pallet, other):
+        for line in orderlines[1:4]:
+            assert dubePacker(p, line)[0]
+    before = _state(pallet)
+
+    # The cases of an orderline already on the pallet, followed by too many cases
+    hosted = (*orderlines[1].cases, *orderlines[0].cases * 4)
+    assert not dubePacker(pallet, hosted)[0]
+    assert _state(pallet) == before
+
+    # The next packing is the same made on a pallet that never failed
+    assert dubePacker(pallet, orderlines[4])[0] and dubePacker(other, orderlines[4])[0]
+    assert _state(pallet) == _state(other)
+
+
+
+@pytest.mark.parametrize("test", TESTS)
+def test_blocks_feasible (test, readtest, newPallet, feasible):
+    pallets = []
+    for line in readtest(test):
+        if not any(dubePacker(p, line, blocks=True)[0] for p in pallets):
+            pallets.append(newPallet())
+            assert dubePacker(pallets[-1], line, blocks=True)[0]
+    # The blocks never place a case where the fit method would not
+    assert all(feasible(p) for p in pallets)
+
+
+
+def test_blocks_used (readtest, newPallet, monkeypatch):
+    # The 73 identical cases of an orderline
+    line = readtest(1)[0]
+    calls = collections.Counter()
+
+    def counter (*args):
+        calls[blocks] += 1
+        return fit(*args)
+
+    monkeypatch.setattr(packer, "fit", counter)
+    for blocks in (False, True):
+        pallet = newPallet()
+        assert dubePacker(pallet, line, blocks=blocks)[0] and len(pallet.cases) == len(line.cases)
+    assert calls[True] * 10 < calls[False]
+
+
+
+# The cases around the column over a case of 14x11x15 at (56, 44, 0), which can be
+# inserted from the left, while a case above it would be obstructed in all directions.
+COLUMN = (
+    (42, 44, 15, 14, 11, 15),
+    (70, 44, 0, 14, 11, 30),
+    (56, 33, 0, 14, 11, 30),
+    (56, 55, 0, 14, 11, 30),
+    (42, 33, 30, 42, 33, 10),
+)
+
+
+def test_blocks_obstructions (newPallet):
+    pallet = newPallet()
+    packed = collections.deque(_case(*c) for c in COLUMN)
+    line = OrderLine("B", 0)
+    run = [Case(line, "B", 14, 11, 15, 1, 5) for _ in range(3)]
+    first = run[0].__copy__()
+    first.setPosition((56, 44, 0))
+    layersMap = collections.defaultdict(int)
+    assert fit(first, pallet, packed, layersMap)
+    packed.append(first)
+
+    n = len(packed)
+    placed = _placeBlock(first, run, 1, pallet, packed)
+    assert len(packed) == n + placed
+    for k in range(n, len(packed)):
+        assert fit(packed[k].__copy__(), pallet, list(packed)[:k], layersMap)
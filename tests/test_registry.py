@@ -0,0 +1,101 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import random
+import pytest
+
+from packing.orderline import OrderLine
+from packing.registry import PalletRegistry
+
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_registry_merges (seed, newPallet):
+    rnd = random.Random(seed)
+    orderlines = tuple(OrderLine(str(i), i) for i in range(60))
+
+    # The starting pallets hold one or more orderlines
+    shuffled, palletsList = list(orderlines), []
+    rnd.shuffle(shuffled)
+    while shuffled:
+        pallet = newPallet()
+        pallet.orderlines = {shuffled.pop() for _ in range(min(len(shuffled), rnd.randint(1, 3)))}
+        palletsList.append(pallet)
+    registry = PalletRegistry(orderlines, palletsList)
+
+    # The pallet of each orderline, updated merging the pallets one into another
+    owner = {line: p for p in palletsList for line in p.orderlines}
+    index = {line: i for i, line in enumerate(orderlines)}
+    alive = list(palletsList)
+    while len(alive) > 1:
+        host, hosted = rnd.sample(alive, 2)
+        hostRoot = registry.find(index[next(iter(host.orderlines))])
+        hostedRoot = registry.find(index[next(iter(hosted.orderlines))])
+        assert registry.pallet(hostRoot) is host and registry.pallet(hostedRoot) is hosted
+        registry.union(hostRoot, hostedRoot)
+        host.orderlines |= hosted.orderlines
+        owner.update((line, host) for line in hosted.orderlines)
+        alive.remove(hosted)
+
+        assert registry.palletsList() == [p for p in palletsList if p in alive]
+        for line in orderlines:
+            assert registry.pallet(registry.find(index[line])) is owner[line]
+
+    registry.assign()
+    assert all(line.pallet is owner[line] for line in orderlines)
+
+
+
+def _state (registry):
+    """
+    Returns the pallet of each orderline and the pallets not merged.
+    """
+    return [registry.pallet(registry.find(i)) for i in range(len(registry.orderlines))], registry.palletsList()
+
+
+
+def _mergeRandom (rnd, registry, index):
+    host, hosted = rnd.sample(registry.palletsList(), 2)
+    registry.union(registry.find(index[next(iter(host.orderlines))]), registry.find(index[next(iter(hosted.orderlines))]))
+    host.orderlines |= hosted.orderlines
+
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_registry_snapshot (seed, newPallet):
+    rnd = random.Random(seed)
+    orderlines = tuple(OrderLine(str(i), i) for i in range(30))
+    palletsList = []
+    for line in orderlines:
+        palletsList.append(newPallet())
+        palletsList[-1].orderlines = {line}
+    registry = PalletRegistry(orderlines, palletsList)
+    index = {line: i for i, line in enumerate(orderlines)}
+
+    for _ in range(10):
+        _mergeRandom(rnd, registry, index)
+    members = {id(p): set(p.orderlines) for p in palletsList}
+    snapshot = registry.snapshot()
+    state = _state(registry)
+
+    # The snapshot is a copy, which is not changed by the next mergings, and can be restored many times
+    for _ in range(2):
+        for _ in range(rnd.randint(1, 15)):
+            _mergeRandom(rnd, registry, index)
+        assert _state(registry) != state
+        registry.restore(snapshot)
+        for p in palletsList:
+            p.orderlines = set(members[id(p)])
+        assert _state(registry) == state
+
+    registry.assign()
+    assert all(line.pallet is p for p in registry.palletsList() for line in p.orderlines)
@@ -0,0 +1,77 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import itertools
+import random
+import numpy as np
+import pytest
+
+import routing
+from packing.orderline import OrderLine
+
+
+
+def _problem (seed, sizes):
+    """
+    Returns a random asymmetric matrix of distances, and groups of orderlines
+    of the given sizes in distinct locations.
+    """
+    rnd = random.Random(seed)
+    n = sum(sizes)
+    dists = np.array([[0 if i == j else rnd.randint(1, 100) for j in range(n + 1)] for i in range(n + 1)], dtype=float)
+    locations = iter(rnd.sample(range(1, n + 1), n))
+    groups = [[OrderLine(str(i), next(locations)) for i in range(size)] for size in sizes]
+    return groups, dists
+
+
+
+def _cost (path, dists):
+    """
+    Returns the distance walked from the depot, through the path, and back to the depot.
+    """
+    locations = [0, *(line.location for line in path), 0]
+    return sum(dists[u, v] for u, v in zip(locations[:-1], locations[1:]))
+
+
+
+def _layered (path, groups):
+    """
+    Returns True if the path visits all the orderlines of each group before those of the next one.
+    """
+    start = 0
+    for group in groups:
+        if set(path[start:start + len(group)]) != set(group):
+            return False
+        start += len(group)
+    return start == len(path)
+
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_held_karp_optimal (seed):
+    groups, dists = _problem(seed, (3, 1, 4, 2))
+    path = routing.optimizePath(groups, dists)
+    assert _layered(path, groups)
+
+    # All the orders of the orderlines that respect the layers
+    best = min(_cost(sum(paths, ()), dists) for paths in itertools.product(*map(itertools.permutations, groups)))
+    assert _cost(path, dists) == pytest.approx(best)
+
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_local_search_improves (seed, monkeypatch):
+    groups, dists = _problem(seed, (6, 12, 5))
+    monkeypatch.setattr(routing, "EXACT_MAX_ORDERLINES", 5)
+    path = routing.optimizePath(groups, dists)
+    assert _layered(path, groups)
+    assert _cost(path, dists) <= _cost(sum(groups, []), dists) + routing.EPSILON
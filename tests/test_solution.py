@@ -0,0 +1,80 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import random
+import pytest
+
+import utils
+from solver import Solver
+from solution import decodeEdges
+
+
+
+def _content (palletsList):
+    """
+    Returns the orderlines, the cases with their positions, the layers, the weight
+    and the volume of each pallet of a solution.
+    """
+    return [(list(map(id, p.sorted_orderlines)),
+             [(c.orderline.code, c.x, c.y, c.z, c.sizex, c.sizey, c.rotated, c.canHold) for c in p.cases],
+             {id(line): layer for line, layer in p.layersMap.items()}, p.weight, p.volume) for p in palletsList]
+
+
+
+@pytest.fixture
+def solver (readtest, dists):
+    orderlines = readtest(12)
+    return Solver(orderlines, utils.get_edges(orderlines, dists), dists, (140, 110, 150), 1200)
+
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_decode_encode (seed, solver):
+    random.seed(seed)
+    sol, edges = solver.heuristic(0.3)
+    cost = solver.solutionCost(sol)
+    content = _content(sol)
+    record = solver.encode(sol, cost, edges)
+
+    # The record is not changed by the search
+    solver.heuristic(0.3)
+    decoded = solver.decode(record, assign=False)
+    assert _content(decoded) == content
+    assert record.cost == cost and solver.solutionCost(decoded) == pytest.approx(cost)
+    assert [(e.origin, e.end) for e in decodeEdges(record, solver.edges)] == [(e.origin, e.end) for e in edges]
+
+    decoded = solver.decode(record)
+    assert all(line.pallet is p for p in decoded for line in p.orderlines)
+
+
+
+def test_record_readonly (solver):
+    random.seed(0)
+    sol, edges = solver.heuristic(0.3)
+    record = solver.encode(sol)
+    for name in ("pallet", "layer", "lines", "cases", "edges"):
+        with pytest.raises(ValueError):
+            getattr(record, name)[0] = 0
+
+
+
+def test_decode_sequential (solver):
+    sol = solver.sequential()
+    assert all(len(p.sorted_orderlines) == len(p.orderlines) == len(p.layersMap) for p in sol)
+    cost = solver.solutionCost(sol)
+    content = _content(sol)
+    record = solver.encode(sol, cost)
+    assert (record.pallet >= 0).all()
+
+    decoded = solver.decode(record, assign=False)
+    assert _content(decoded) == content
+    assert solver.solutionCost(decoded) == pytest.approx(cost)
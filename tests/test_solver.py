@@ -0,0 +1,234 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import collections
+import random
+import numpy as np
+import pytest
+
+import utils
+from solver import Solver
+from packing.case import resetCase
+from packing.edge import Edge
+from packing.orderline import OrderLine
+
+
+
+def _solver (orderlines, dists, **kwargs):
+    """
+    Returns a solver for some orderlines, with the pallets of the real tests.
+    """
+    return Solver(orderlines, utils.get_edges(orderlines, dists), dists, (140, 110, 150), 1200, **kwargs)
+
+
+
+def _covers (palletsList, orderlines):
+    """
+    Returns True if each orderline is in exactly one pallet of a solution, and
+    each pallet contains all the cases of its orderlines.
+    """
+    lines = [line for p in palletsList for line in p.sorted_orderlines]
+    return (sorted(map(id, lines)) == sorted(map(id, orderlines))
+            and all(len(p.cases) == sum(len(line.cases) for line in p.sorted_orderlines) for p in palletsList))
+
+
+
+def _content (pallet):
+    return [(c.orderline.code, c.x, c.y, c.z, c.rotated) for c in pallet.cases]
+
+
+
+def test_warm_start (readtest, dists, feasible):
+    orderlines = readtest(2)
+    solver = _solver(orderlines, dists)
+    random.seed(0)
+    sol, edges = solver.heuristic(0.3)
+    cost = solver.solutionCost(sol)
+    record = solver.encode(sol, cost, edges)
+
+    # The solution is adopted, with the same cost, by another solver
+    other = _solver(orderlines, dists)
+    other.warm_start(record)
+    seed, seedEdges = other.seed
+    assert [_content(p) for p in seed] == [_content(p) for p in sol]
+    assert all(line.pallet is p for p in seed for line in p.sorted_orderlines)
+    assert other.solutionCost(seed) == pytest.approx(cost) and len(seedEdges) == len(edges)
+
+    # And the search starts from it
+    first = next(other.anytime(0))
+    assert first.cost <= cost + 1e-6
+    assert _covers(other.decode(first.solution, assign=False), orderlines)
+
+
+
+def test_update_added (readtest, dists, feasible):
+    orderlines = readtest(2)
+    added = orderlines[-3:]
+    solver = _solver(orderlines[:-3], dists)
+    sol, cost, _ = solver(0)
+    before = sorted(_content(p) for p in sol)
+
+    solver.update(added=added)
+    seed, seedEdges = solver.seed
+    assert _covers(seed, orderlines) and all(feasible(p) for p in seed)
+    # The new orderlines are added as one pallet each, and the other pallets do not change
+    assert [p.sorted_orderlines for p in seed[-3:]] == [[line] for line in added]
+    assert sorted(_content(p) for p in seed[:-3]) == before
+    assert all(e.origin.pallet is e.end.pallet for e in seedEdges)
+    assert solver.solutionCost(seed) == pytest.approx(cost + sum(solver.solutionCost([p]) for p in seed[-3:]))
+    assert {id(line) for e in solver.edges for line in (e.origin, e.end)} == set(map(id, orderlines))
+
+    sol, cost, _ = solver(0)
+    assert _covers(sol, orderlines) and cost == pytest.approx(solver.solutionCost(sol))
+
+
+
+def test_update_removed (readtest, dists, feasible):
+    orderlines = readtest(2)
+    solver = _solver(orderlines, dists)
+    sol, _, _ = solver(0)
+    # Remove an orderline from the largest pallet
+    removed = max(sol, key=lambda p: len(p.sorted_orderlines)).sorted_orderlines[0]
+    kept = tuple(line for line in orderlines if line is not removed)
+
+    solver.update(removed=(removed,))
+    owner = removed.pallet
+    seed, seedEdges = solver.seed
+    assert _covers(seed, kept) and all(feasible(p) for p in seed)
+    assert all(removed not in (e.origin, e.end) for e in seedEdges)
+    assert all(removed not in (e.origin, e.end) for e in solver.edges)
+
+    # The removed orderline is never touched by the next searches
+    sol, cost, _ = solver(0)
+    for seed in range(3):
+        random.seed(seed)
+        solver.heuristic(0.3)
+    assert _covers(sol, kept) and cost == pytest.approx(solver.solutionCost(sol))
+    assert removed.pallet is owner
+
+
+
+def _mergeInto (solver, host, hosted):
+    """
+    Merges two pallets as the heuristic does.
+    """
+    assert solver._merge(host, hosted)
+    host.weight += hosted.weight
+    host.volume += hosted.volume
+    host.orderlines.update(hosted.orderlines)
+    host.sorted_orderlines.extend(hosted.sorted_orderlines)
+    host.snapshot()
+
+
+
+def test_destruction_prefix (readtest, dists, feasible):
+    orderlines = readtest(2)
+    l0, l1, l2, l3, l4, l5 = (orderlines[i] for i in (1, 2, 3, 4, 5, 7))
+    solver = _solver(orderlines, dists)
+    infeasible = solver.infeasible
+
+    # A pallet with snapshots after the first, the second, and all the orderlines
+    pallet = solver._single(l0)
+    _mergeInto(solver, pallet, solver._single(l1))
+    _mergeInto(solver, pallet, solver._build((l2, l3, l4, l5)))
+    assert [s[0] for s in pallet.snapshots] == [1, 2, 6]
+    for line in pallet.sorted_orderlines:
+        line.pallet = pallet
+
+    # Splitting before l4, the first two orderlines are recovered and l2, l3 are packed again
+    solutionEdges = collections.deque([Edge(l4, l3, 0, 0)])
+    palletsList, _ = solver.destruction([pallet], solutionEdges, 1)
+    assert len(palletsList) == 2 and not solutionEdges
+    first, second = sorted(palletsList, key=lambda p: len(p.sorted_orderlines))
+    assert first.sorted_orderlines == [l4, l5] and second.sorted_orderlines == [l0, l1, l2, l3]
+    assert all(line.pallet is p for p in palletsList for line in p.sorted_orderlines)
+    assert all(feasible(p) for p in palletsList) and solver.verify(palletsList)[1] == 0
+
+    # The same packing of the first two orderlines merged, and then the others packed over them
+    full = solver._single(l0)
+    _mergeInto(solver, full, solver._single(l1))
+    assert solver.packer.pack(full, tuple(resetCase(c) for line in (l2, l3) for c in line.cases))
+    assert _content(second) == _content(full)
+    assert second.weight == pytest.approx(full.weight + l2.weight + l3.weight)
+
+    # Its signature is the one of the packing over the prefix, not the one of the packing from scratch
+    assert second.signature == infeasible.appended(full.signature, (l2, l3))
+    assert second.signature not in (infeasible.leaf((l0, l1, l2, l3)), full.signature)
+    assert first.signature == infeasible.leaf((l4, l5))
+    assert second.snapshots[-1][:3] == (4, len(second.cases), second.signature)
+
+
+
+@pytest.mark.parametrize("test", (2, 12))
+def test_sequential (test, readtest, dists, feasible):
+    orderlines = readtest(test)
+    solver = _solver(orderlines, dists)
+    sol = solver.sequential()
+    assert sorted(id(line) for p in sol for line in p.orderlines) == sorted(map(id, orderlines))
+    assert all(line.pallet is p for p in sol for line in p.orderlines)
+    assert all(len(p.cases) == sum(len(line.cases) for line in p.orderlines) for p in sol)
+    assert all(feasible(p) for p in sol) and len(sol) < len(orderlines)
+
+    verified, split = solver.verify(sol)
+    assert split == 0 and len(verified) == len(sol)
+
+
+
+def _walk (locations, dists):
+    """
+    Returns the distance walked from the depot, through the locations, and back to the depot.
+    """
+    tour = [0, *locations, 0]
+    return sum(dists[u, v] for u, v in zip(tour[:-1], tour[1:]))
+
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_paths_cost (seed):
+    rnd = np.random.default_rng(seed)
+    dists = rnd.uniform(1, 100, (30, 30))
+    np.fill_diagonal(dists, 0)
+    # Random paths, including empty and single-node ones
+    paths = [rnd.integers(1, 30, size).tolist() for size in rnd.choice((0, 1, 2, 7, 20), 15)]
+    paths[0], paths[-1] = [], [int(rnd.integers(1, 30))]
+
+    costs = Solver.pathsCost(paths, dists)
+    assert costs == pytest.approx([_walk(path, dists) for path in paths])
+    assert Solver.pathsCost([], dists).tolist() == []
+    assert Solver.pathsCost([[]], dists).tolist() == [0]
+
+    lines = {}
+    orderlinesPaths = {i: tuple(lines.setdefault(l, OrderLine(str(l), l)) for l in path) for i, path in enumerate(paths)}
+    assert Solver.getCost(orderlinesPaths, dists) == pytest.approx(sum(costs))
+    assert Solver.getCost({}, dists) == 0
+    for path in orderlinesPaths.values():
+        assert Solver.singlePathCost(path, dists) == pytest.approx(_walk([l.location for l in path], dists))
+
+
+
+def test_solution_cost_cache (readtest, dists):
+    orderlines = readtest(2)
+    solver = _solver(orderlines, dists)
+    random.seed(0)
+    sol, _ = solver.heuristic(0.3)
+    direct = sum(_walk(solver._locations(p), dists) for p in sol)
+    assert solver.solutionCost(sol) == pytest.approx(direct)
+    assert solver.getCost(solver.lazy_paths(sol), dists) == pytest.approx(direct)
+    assert all(p.routeCost == pytest.approx(_walk(solver._locations(p), dists)) for p in sol)
+
+    # The cached costs are used until the packer changes a pallet
+    host, hosted = solver._single(orderlines[1]), solver._single(orderlines[2])
+    cost = solver.solutionCost([host, hosted])
+    host.routeCost += 1000
+    assert solver.solutionCost([host, hosted]) == pytest.approx(cost + 1000)
+    assert solver.packer.pack(host, hosted) and host.routeCost is None
+    assert len(host.layersMap) == 2 and solver.solutionCost([host]) == pytest.approx(_walk(solver._locations(host), dists))
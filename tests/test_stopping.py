@@ -0,0 +1,120 @@
+"""
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+This file is part of the implementation of an algorithm for solving the
+3-dimensional case picking problem. A newly considered problem of operational
+research that combines the routing of pickers into the warehouse, with the
+positioning of 3-dimensional items inside pallets (i.e., Pallet Loading Problem).
+
+The algorithm proposed and implemented comes from a collaboration between the
+Department of Engineering at University of Parma (Parma, ITALY) and the
+IN3 Computer Science Dept. at Universitat Oberta de Catalunya (Barcelona, SPAIN).
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+"""
+import multiprocessing
+import threading
+import pytest
+
+import utils
+from solver import Solver
+from stopping import (SearchState, StoppingRule, AnyOf, TimeLimit, Deadline, IterationLimit, Stagnation,
+                      TargetCost, Gap, Cancelled)
+
+
+
+def _state (**attrs):
+    """
+    Returns the state of a search started at time 0 with cost 100, updated with the given attributes.
+    """
+    state = SearchState(100, start=0)
+    for name, value in attrs.items():
+        setattr(state, name, value)
+    return state
+
+
+
+def _cancelled ():
+    token = threading.Event()
+    token.set()
+    return Cancelled(token)
+
+
+
+# For each rule, a state in which it stops the search with its reason, and one in which it does not.
+RULES = (
+    (TimeLimit(10), _state(now=10), _state(now=9), "time"),
+    (Deadline(50), _state(now=50), _state(now=49), "deadline"),
+    (IterationLimit(5), _state(iterations=5), _state(iterations=4), "iterations"),
+    (Stagnation(iterations=3), _state(iterations=8, lastIteration=5), _state(iterations=7, lastIteration=5), "stagnation"),
+    (Stagnation(seconds=2), _state(now=7, lastTime=5), _state(now=6, lastTime=5), "stagnation"),
+    (TargetCost(100), _state(), _state(cost=101), "target"),
+    (Gap(90, 0.2), _state(cost=108), _state(cost=109), "gap"),
+    (_cancelled(), _state(), None, "cancelled"),
+)
+
+
+@pytest.mark.parametrize("rule, stopped, running, reason", RULES)
+def test_rules (rule, stopped, running, reason):
+    assert rule(stopped) and rule.check(stopped) == reason
+    if running is not None:
+        assert not rule(running) and rule.check(running) is None
+
+
+
+def test_any_of ():
+    rule = IterationLimit(5) | (TimeLimit(10) | Deadline(50))
+    assert isinstance(rule, AnyOf) and len(rule.rules) == 3
+    # The reason is the one of the first rule that stops the search
+    assert rule.check(_state(now=60, iterations=5)) == "iterations"
+    assert rule.check(_state(now=60)) == "time"
+    assert rule.check(_state(now=9)) is None and not rule(_state(now=9))
+    assert AnyOf().check(_state()) is None
+
+
+
+def test_abstract_rule ():
+    with pytest.raises(TypeError):
+        StoppingRule()
+
+
+
+@pytest.fixture
+def solver (readtest, dists):
+    orderlines = readtest(2)
+    return Solver(orderlines, utils.get_edges(orderlines, dists), dists, (140, 110, 150), 1200)
+
+
+
+def test_solver_stop_reason (solver):
+    sol, cost, iterations = solver(60, stopping=IterationLimit(3))
+    assert solver.stop_reason == "iterations" and iterations == 3
+
+    solver(0)
+    assert solver.stop_reason == "time"
+
+    solver(60, stopping=TargetCost(float("inf")))
+    assert solver.stop_reason == "target"
+
+    token = threading.Event()
+    token.set()
+    assert len(list(solver.anytime(60, cancel=token))) == 1
+    assert solver.stop_reason == "cancelled"
+
+    # The search interrupted by the caller has no reason
+    search = solver.anytime(60)
+    next(search)
+    search.close()
+    assert solver.stop_reason is None
+
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork is not available")
+@pytest.mark.parametrize("maxtime, stopping", ((0.3, None), (60, IterationLimit(2))))
+def test_multi_start_stop_reason (solver, maxtime, stopping):
+    sol, cost, iterations = solver.multi_start(maxtime, stopping=stopping)
+    serial = solver.stop_reason
+    assert solver.verify(sol)[0]
+
+    # The processes report the same reason of the serial search
+    sol, cost, iterations = solver.multi_start(maxtime, workers=2, stopping=stopping)
+    assert solver.stop_reason == serial and iterations > 0
+    assert solver.verify(sol)[0] and cost == pytest.approx(solver.solutionCost(sol))